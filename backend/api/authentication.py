@@ -0,0 +1,81 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+from foodgram.const import (
+    AUTH_TOKEN_CACHE_KEY,
+    AUTH_TOKEN_CACHE_TIMEOUT,
+    AUTH_TOKEN_LOCAL_MAX_SIZE,
+    AUTH_TOKEN_LOCAL_TTL,
+)
+
+
+def shared_key(key):
+    return AUTH_TOKEN_CACHE_KEY.format(
+        digest=hashlib.sha256(key.encode("utf-8")).hexdigest()
+    )
+
+
+class TokenCache:
+    def __init__(self, ttl=AUTH_TOKEN_LOCAL_TTL, max_size=AUTH_TOKEN_LOCAL_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        if settings.AUTH_TOKEN_SHARED_CACHE:
+            return cache.get(shared_key(key))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+        return None
+
+    def set(self, key, value):
+        if settings.AUTH_TOKEN_SHARED_CACHE:
+            cache.set(shared_key(key), value, AUTH_TOKEN_CACHE_TIMEOUT)
+        else:
+            self._remember(key, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if settings.AUTH_TOKEN_SHARED_CACHE and keys:
+            cache.delete_many([shared_key(key) for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        user, token = cached
+        return copy.copy(user), token
@@ -0,0 +1,70 @@
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response, parse_etags
+from django.utils.http import http_date
+from rest_framework import status
+
+from foodgram.cache import response_cache_key
+from foodgram.const import RESPONSE_CACHE_TIMEOUT
+
+
+class CachedResponseMixin:
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        key = response_cache_key(
+            self.cache_namespace, request, request.accepted_renderer.format
+        )
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            response = self.finalize_response(request, response, *args, **kwargs)
+            response.render()
+            etag = f'"{hashlib.md5(response.content).hexdigest()}"'
+            cached = (response.content, response["Content-Type"], etag)
+            cache.set(key, cached, RESPONSE_CACHE_TIMEOUT)
+
+        content, content_type, etag = cached
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        return response
+
+
+class ConditionalResponseMixin:
+    def get_etag(self, request):
+        return None
+
+    def get_last_modified(self, request):
+        return None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        last_modified = self.get_last_modified(request)
+        timestamp = last_modified and int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            if etag:
+                response["ETag"] = etag
+            if timestamp:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
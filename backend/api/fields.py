@@ -0,0 +1,111 @@
+import binascii
+import uuid
+from tempfile import SpooledTemporaryFile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, UnidentifiedImageError
+from rest_framework import serializers
+
+from foodgram.const import (
+    IMAGE_UPLOAD_ALLOWED_FORMATS,
+    IMAGE_UPLOAD_DECODE_CHUNK_SIZE,
+    IMAGE_UPLOAD_MAX_PIXELS,
+    IMAGE_UPLOAD_MAX_SIDE,
+    IMAGE_UPLOAD_SPOOL_MAX_SIZE,
+)
+from foodgram.images import variant_names
+
+
+class Base64ImageField(serializers.ImageField):
+    default_error_messages = {
+        "invalid_base64": "Загрузите корректное изображение в формате base64.",
+        "invalid_format": "Неподдерживаемый формат изображения.",
+        "too_large": (
+            "Размер изображения не должен превышать {max_side}x{max_side} пикселей."
+        ),
+        "too_many_pixels": (
+            "Изображение не должно содержать больше {max_pixels} пикселей."
+        ),
+    }
+
+    def to_internal_value(self, data):
+        if data in (None, ""):
+            return None
+        if not isinstance(data, str):
+            self.fail("invalid_base64")
+
+        header_end = data.find(";base64,")
+        start = 0 if header_end == -1 else header_end + len(";base64,")
+        file = SpooledTemporaryFile(max_size=IMAGE_UPLOAD_SPOOL_MAX_SIZE)
+        try:
+            size = self.decode_into(data, start, file)
+            image_format = self.validate_image(file)
+        except serializers.ValidationError:
+            file.close()
+            raise
+
+        file.seek(0)
+        return UploadedFile(
+            file=file,
+            name=f"{uuid.uuid4()}.{image_format.lower()}",
+            content_type=Image.MIME[image_format],
+            size=size,
+        )
+
+    def decode_into(self, data, start, file):
+        chunk_size = IMAGE_UPLOAD_DECODE_CHUNK_SIZE // 4 * 4
+        size = 0
+        try:
+            for offset in range(start, len(data), chunk_size):
+                chunk = binascii.a2b_base64(data[offset : offset + chunk_size])
+                file.write(chunk)
+                size += len(chunk)
+        except (binascii.Error, ValueError):
+            self.fail("invalid_base64")
+        if not size:
+            self.fail("invalid_base64")
+        return size
+
+    def validate_image(self, file):
+        file.seek(0)
+        try:
+            image = Image.open(file)
+        except Image.DecompressionBombError:
+            self.fail("too_large", max_side=IMAGE_UPLOAD_MAX_SIDE)
+        except (UnidentifiedImageError, OSError):
+            self.fail("invalid_base64")
+        if image.format not in IMAGE_UPLOAD_ALLOWED_FORMATS:
+            self.fail("invalid_format")
+        if max(image.size) > IMAGE_UPLOAD_MAX_SIDE:
+            self.fail("too_large", max_side=IMAGE_UPLOAD_MAX_SIDE)
+        width, height = image.size
+        if width * height > IMAGE_UPLOAD_MAX_PIXELS:
+            self.fail("too_many_pixels", max_pixels=IMAGE_UPLOAD_MAX_PIXELS)
+        file.seek(0)
+        try:
+            Image.open(file).verify()
+        except (OSError, SyntaxError, ValueError):
+            self.fail("invalid_base64")
+        return image.format
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    def __init__(self, ready, **kwargs):
+        self.ready = ready
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        names = variant_names(value.name)
+        if not getattr(value.instance, self.ready):
+            return dict.fromkeys(names)
+        request = self.context.get("request")
+        variants = {}
+        for variant, name in names.items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            variants[variant] = url
+        return variants
@@ -1,6 +1,109 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import FieldError
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = 10
+    max_page_size = 100
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(position))
+            except (DjangoValidationError, FieldError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        page_size = self.get_page_size(request)
+        page = list(queryset[: page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not ordering or ordering[-1].lstrip("-") not in ("pk", "id"):
+            ordering.append("-pk" if ordering and ordering[-1][0] == "-" else "pk")
+        return ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def after(self, position):
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, obj):
+        position = [getattr(obj, field.lstrip("-")) for field in self.ordering]
+        encoded = json.dumps(position, default=lambda value: value.isoformat())
+        return urlsafe_b64encode(encoded.encode("utf-8")).decode("ascii")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1]),
+        )
 
 
 class DefaultPagination(PageNumberPagination):
     page_size_query_param = "limit"
     page_size = 10
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
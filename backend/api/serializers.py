@@ -1,13 +1,18 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 
+from recipes.models import Recipe
 from recipes.serializers import RecipeMinifiedSerializer
 from users.models import User
 
+from .fields import ImageVariantsField
+
 
 class UserWithRecipesSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField()
+    avatar_variants = ImageVariantsField(source="avatar", ready="avatar_variants_ready")
 
     class Meta:
         model = User
@@ -18,23 +23,41 @@ class UserWithRecipesSerializer(serializers.ModelSerializer):
             "first_name",
             "last_name",
             "avatar",
+            "avatar_variants",
             "is_subscribed",
             "recipes",
             "recipes_count",
         )
 
+    @staticmethod
+    def get_recipes_limit(request):
+        recipes_limit = request.query_params.get("recipes_limit")
+        if recipes_limit and recipes_limit.isdigit():
+            return int(recipes_limit)
+        return None
+
+    @classmethod
+    def prefetch(cls, queryset, request):
+        recipes = Recipe.objects.all()
+        recipes_limit = cls.get_recipes_limit(request)
+        if recipes_limit is not None:
+            recipes = recipes.limit_per_author(recipes_limit)
+        return queryset.with_subscription_flag(request.user).prefetch_related(
+            Prefetch("recipes", queryset=recipes)
+        )
+
     def get_is_subscribed(self, obj):
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
         request = self.context.get("request")
-        return request.user.is_authenticated and obj in request.user.subscriptions.all()
+        return (
+            request.user.is_authenticated
+            and request.user.subscriptions.filter(pk=obj.pk).exists()
+        )
 
     def get_recipes(self, obj):
-        request = self.context.get("request")
-        recipes_limit = request.query_params.get("recipes_limit")
         queryset = obj.recipes.all()
-        if recipes_limit and recipes_limit.isdigit():
-            queryset = queryset[: int(recipes_limit)]
+        recipes_limit = self.get_recipes_limit(self.context.get("request"))
+        if recipes_limit is not None:
+            queryset = queryset[:recipes_limit]
         return RecipeMinifiedSerializer(queryset, many=True).data
-
-    @staticmethod
-    def get_recipes_count(obj):
-        return obj.recipes.count()
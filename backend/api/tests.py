@@ -0,0 +1,110 @@
+import base64
+from io import BytesIO
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from api.fields import Base64ImageField
+
+from recipes.tests.factories import (
+    client_for,
+    create_ingredients,
+    create_recipes,
+    create_user,
+)
+
+RECIPES_PER_AUTHOR = 10
+
+
+class SubscriptionsQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = create_user("viewer")
+        cls.authors = [create_user(f"author{number}") for number in range(8)]
+        create_recipes(
+            cls.authors, RECIPES_PER_AUTHOR * len(cls.authors), create_ingredients(1)
+        )
+        cls.viewer.subscriptions.add(*cls.authors[:6])
+
+    def setUp(self):
+        self.client = client_for(self.viewer)
+
+    def get_subscriptions(self, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/users/subscriptions/", params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()["results"]
+
+    def test_queries_do_not_grow_with_page_size_and_recipes_limit(self):
+        counts = set()
+        for recipes_limit in (1, 3, 10, 50):
+            for page_size in (2, 6):
+                count, results = self.get_subscriptions(
+                    {"limit": page_size, "recipes_limit": recipes_limit}
+                )
+                counts.add(count)
+                self.assertEqual(len(results), page_size)
+                for author in results:
+                    self.assertTrue(author["is_subscribed"])
+                    self.assertEqual(author["recipes_count"], RECIPES_PER_AUTHOR)
+                    self.assertEqual(
+                        len(author["recipes"]),
+                        min(recipes_limit, RECIPES_PER_AUTHOR),
+                    )
+        self.assertEqual(len(counts), 1, counts)
+
+    def test_recipes_limit_keeps_newest_recipes(self):
+        author = self.authors[0]
+        _, results = self.get_subscriptions({"recipes_limit": 3})
+        recipes = next(row["recipes"] for row in results if row["id"] == author.pk)
+        self.assertEqual(
+            [recipe["id"] for recipe in recipes],
+            list(
+                author.recipes.order_by("-created", "-id").values_list("pk", flat=True)[
+                    :3
+                ]
+            ),
+        )
+
+    def test_subscribe_response_queries_do_not_grow_with_recipes_limit(self):
+        counts = set()
+        for recipes_limit in (1, 10, 50):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(
+                    f"/api/users/{self.authors[7].pk}/subscribe/"
+                    f"?recipes_limit={recipes_limit}"
+                )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(
+                len(response.json()["recipes"]),
+                min(recipes_limit, RECIPES_PER_AUTHOR),
+            )
+            counts.add(len(context.captured_queries))
+            self.client.delete(f"/api/users/{self.authors[7].pk}/subscribe/")
+        self.assertEqual(len(counts), 1, counts)
+
+
+class Base64ImageFieldTest(SimpleTestCase):
+    def encode(self, size, cut=0):
+        buffer = BytesIO()
+        Image.new("RGB", size).save(buffer, format="PNG")
+        data = buffer.getvalue()
+        return base64.b64encode(data[: len(data) - cut]).decode()
+
+    def assert_rejected(self, payload, code):
+        with self.assertRaises(ValidationError) as context:
+            Base64ImageField().to_internal_value(payload)
+        self.assertEqual(context.exception.detail[0].code, code)
+
+    def test_accepts_valid_image(self):
+        upload = Base64ImageField().to_internal_value(self.encode((16, 16)))
+        self.assertEqual(upload.content_type, "image/png")
+
+    def test_rejects_too_many_pixels(self):
+        self.assert_rejected(self.encode((4097, 4096)), "too_many_pixels")
+
+    def test_rejects_truncated_image(self):
+        self.assert_rejected(self.encode((64, 64), cut=20), "invalid_base64")
@@ -3,7 +3,7 @@ from rest_framework import routers
 
 from recipes.views import IngredientViewSet, RecipeViewSet
 
-from .views import AvatarUpdateView, UserViewSet
+from .views import AvatarUpdateView, QueryProfileView, UserViewSet
 
 app_name = "api"
 
@@ -14,6 +14,7 @@ router.register("ingredients", IngredientViewSet, basename="ingredients")
 
 urlpatterns = [
     path("users/me/avatar/", AvatarUpdateView.as_view(), name="avatar-update"),
+    path("profiling/", QueryProfileView.as_view(), name="profiling"),
     path("", include(router.urls)),
     path("", include("djoser.urls")),
     path("auth/", include("djoser.urls.authtoken")),
@@ -1,23 +1,35 @@
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from djoser.serializers import UserCreateSerializer
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from foodgram.const import PROFILING_REPORT_LIMIT
+from foodgram.database import connection_stats
+from foodgram.images import delete_image_variants
+from foodgram.links import create_link, delete_link
+from foodgram.profiling import profile_store
+from foodgram.replicas import ReplicaReadMixin
 from users.models import User
 from users.serializers import SetAvatarSerializer, SetPasswordSerializer, UserSerializer
+from users.subscriptions import change_subscriptions
 from .pagination import DefaultPagination
 from .serializers import UserWithRecipesSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserCreateSerializer
     permission_classes = (AllowAny,)
     pagination_class = DefaultPagination
 
+    def get_queryset(self):
+        return User.objects.with_subscription_flag(self.request.user)
+
     def get_serializer_class(self):
         if self.action in ["list", "retrieve", "me"]:
             return UserSerializer
@@ -60,7 +72,9 @@ class UserViewSet(viewsets.ModelViewSet):
         url_path="subscriptions",
     )
     def subscriptions(self, request):
-        subscribed_users = request.user.subscriptions.all()
+        subscribed_users = UserWithRecipesSerializer.prefetch(
+            request.user.subscriptions.all(), request
+        )
         page = self.paginate_queryset(subscribed_users)
         serializer = UserWithRecipesSerializer(
             page, many=True, context={"request": request}
@@ -80,6 +94,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return self.remove_subscribe(request, pk)
 
     @staticmethod
+    @transaction.atomic
     def add_subscribe(request, pk=None):
         user = request.user
         author = get_object_or_404(User, pk=pk)
@@ -90,31 +105,36 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if user.subscriptions.filter(pk=author.pk).exists():
+        if not create_link(
+            User.subscriptions.through, from_user_id=user.id, to_user_id=author.id
+        ):
             return Response(
                 {"errors": "Вы уже подписаны на этого пользователя."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        change_subscriptions(user.id, [author.id], 1)
 
-        user.subscriptions.add(author)
-
+        author = UserWithRecipesSerializer.prefetch(
+            User.objects.filter(pk=author.pk), request
+        ).get()
         serializer = UserWithRecipesSerializer(author, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @staticmethod
+    @transaction.atomic
     def remove_subscribe(request, pk=None):
         author = get_object_or_404(User, pk=pk)
 
-        through_model = User.subscriptions.through
-        deleted_count, _ = through_model.objects.filter(
-            from_user_id=request.user.id, to_user_id=author.id
-        ).delete()
-
-        if not deleted_count:
+        if not delete_link(
+            User.subscriptions.through,
+            from_user_id=request.user.id,
+            to_user_id=author.id,
+        ):
             return Response(
                 {"detail": f"Вы не подписаны на {author.username}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        change_subscriptions(request.user.id, [author.id], -1)
 
         return Response(
             {"detail": f"Вы отписались от {author.username}"},
@@ -122,7 +142,7 @@ class UserViewSet(viewsets.ModelViewSet):
         )
 
 
-class AvatarUpdateView(APIView):
+class AvatarUpdateView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def put(self, request):
@@ -139,7 +159,30 @@ class AvatarUpdateView(APIView):
     def delete(self, request, *args, **kwargs):
         user = request.user
         if user.avatar:
+            delete_image_variants(user.avatar.name)
             user.avatar.delete(save=False)
             user.avatar = None
             user.save(update_fields=["avatar"])
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class QueryProfileView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", PROFILING_REPORT_LIMIT))
+        except ValueError:
+            limit = PROFILING_REPORT_LIMIT
+        return Response(
+            {
+                "enabled": settings.QUERY_PROFILING,
+                "views": profile_store.report(limit),
+                "connections": connection_stats.report(),
+            }
+        )
+
+    def delete(self, request):
+        profile_store.reset()
+        connection_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
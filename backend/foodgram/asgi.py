@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "foodgram.settings")
+os.environ.setdefault("SERVER_MODE", "asgi")
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+from foodgram.concurrency import StreamingASGIHandler  # noqa: E402
+
+application = StreamingASGIHandler()
@@ -0,0 +1,7 @@
+from django.db.backends.postgresql import base
+
+from foodgram.database import InstrumentedDatabaseMixin
+
+
+class DatabaseWrapper(InstrumentedDatabaseMixin, base.DatabaseWrapper):
+    pass
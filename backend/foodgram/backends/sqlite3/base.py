@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+from foodgram.database import InstrumentedDatabaseMixin
+
+
+class DatabaseWrapper(InstrumentedDatabaseMixin, base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        if self.alias in settings.DATABASE_REPLICAS:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute("BEGIN IMMEDIATE")
@@ -0,0 +1,81 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from foodgram.const import (
+    DB_REPLICA_STICKY_KEY,
+    RESPONSE_CACHE_KEY,
+    RESPONSE_CACHE_VERSION_KEY,
+)
+
+
+def get_cache_version(namespace):
+    key = RESPONSE_CACHE_VERSION_KEY.format(namespace=namespace)
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key) or time.time_ns()
+
+
+def bump_cache_version(namespace):
+    key = RESPONSE_CACHE_VERSION_KEY.format(namespace=namespace)
+    if not cache.add(key, time.time_ns(), None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+    mark_sticky(namespace)
+
+
+def mark_sticky(*namespaces):
+    if settings.DATABASE_REPLICAS and namespaces:
+        cache.set_many(
+            {
+                DB_REPLICA_STICKY_KEY.format(namespace=namespace): True
+                for namespace in namespaces
+            },
+            settings.DB_REPLICA_STICKY_SECONDS,
+        )
+
+
+def is_sticky(*namespaces):
+    return bool(
+        cache.get_many(
+            [
+                DB_REPLICA_STICKY_KEY.format(namespace=namespace)
+                for namespace in namespaces
+            ]
+        )
+    )
+
+
+def invalidate_cache(namespace):
+    transaction.on_commit(lambda: bump_cache_version(namespace))
+
+
+def response_cache_key(namespace, request, renderer_format):
+    auth = "user" if request.user.is_authenticated else "anon"
+    digest = hashlib.md5(
+        f"{renderer_format}:{request.get_full_path()}".encode("utf-8")
+    ).hexdigest()
+    return RESPONSE_CACHE_KEY.format(
+        namespace=namespace,
+        version=get_cache_version(namespace),
+        auth=auth,
+        digest=digest,
+    )
+
+
+def user_state_namespace(user_id):
+    return f"user:{user_id}"
+
+
+def get_user_state_version(user):
+    if not user.is_authenticated:
+        return "anon"
+    return f"{user.pk}:{get_cache_version(user_state_namespace(user.pk))}"
+
+
+def invalidate_user_state(user_id):
+    invalidate_cache(user_state_namespace(user_id))
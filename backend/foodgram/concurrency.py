@@ -0,0 +1,93 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections, connections
+
+from foodgram.database import schedule_health_checks
+from foodgram.profiling import profiled_connections
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_VIEW_THREADS, thread_name_prefix="sync-view"
+)
+
+
+async def run_sync(function, *args, **kwargs):
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(context.run, function, *args, **kwargs)
+    )
+
+
+def call_view(view, request, *args, **kwargs):
+    close_old_connections()
+    schedule_health_checks()
+    try:
+        with profiled_connections():
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, "render", None)):
+                response = response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_sync(call_view, view, request, *args, **kwargs)
+
+    return wrapper
+
+
+class AsyncActionsMixin:
+    async_actions = ()
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if settings.ASYNC_VIEWS and set(cls.async_actions) & set(actions.values()):
+            return async_view(view)
+        return view
+
+
+class StreamingASGIHandler(ASGIHandler):
+    async def send_response(self, response, send):
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+        parts = iter(response)
+        response.streaming_content = ()
+
+        async def send_parts(message):
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                await self.stream(parts, send)
+            await send(message)
+
+        await super().send_response(response, send_parts)
+
+    async def stream(self, parts, send):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        end = object()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream") as stream:
+            try:
+                while True:
+                    part = await loop.run_in_executor(
+                        stream, context.run, next, parts, end
+                    )
+                    if part is end:
+                        return
+                    for chunk, _ in self.chunk_bytes(part):
+                        await send(
+                            {
+                                "type": "http.response.body",
+                                "body": chunk,
+                                "more_body": True,
+                            }
+                        )
+            finally:
+                await loop.run_in_executor(stream, connections.close_all)
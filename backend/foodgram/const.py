@@ -13,3 +13,49 @@ USER_USERNAME_REGEX = r"^[\w.@+-]+\Z"
 USER_FIRST_NAME_MAX_LENGTH = 50
 USER_LAST_NAME_MAX_LENGTH = 50
 USER_AVATAR_UPLOAD_TO = "users/avatars/"
+
+SHOPPING_LIST_FILENAME = "shopping_list"
+SHOPPING_LIST_CHUNK_SIZE = 500
+
+INGREDIENT_INDEX_VERSION_KEY = "ingredient_index_version"
+INDEX_FRESHNESS_CHECK_INTERVAL = 5
+INDEX_MAX_AGE = 5 * 60
+
+IMAGE_PROCESSING_WORKERS = 2
+IMAGE_VARIANT_FORMAT = "WEBP"
+IMAGE_VARIANT_EXTENSION = "webp"
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANTS = {
+    "thumbnail": (320, 320),
+    "medium": (960, 960),
+}
+
+IMAGE_UPLOAD_ALLOWED_FORMATS = ("JPEG", "PNG", "GIF", "WEBP")
+IMAGE_UPLOAD_MAX_SIDE = 8000
+IMAGE_UPLOAD_MAX_PIXELS = 4096 * 4096
+IMAGE_UPLOAD_DECODE_CHUNK_SIZE = 64 * 1024
+IMAGE_UPLOAD_SPOOL_MAX_SIZE = 1024 * 1024
+
+RESPONSE_CACHE_TIMEOUT = 10 * 60
+RESPONSE_CACHE_VERSION_KEY = "response_cache_version:{namespace}"
+RESPONSE_CACHE_KEY = "response_cache:{namespace}:{version}:{auth}:{digest}"
+
+RECIPE_MATCH_INDEX_VERSION_KEY = "recipe_match_index_version"
+RECIPE_MATCH_DEFAULT_LIMIT = 10
+RECIPE_MATCH_MAX_LIMIT = 100
+RECIPE_MATCH_LOAD_CHUNK_SIZE = 5000
+
+RECIPE_BULK_MAX_SIZE = 100
+
+AUTH_TOKEN_LOCAL_TTL = 30
+AUTH_TOKEN_LOCAL_MAX_SIZE = 10_000
+AUTH_TOKEN_CACHE_TIMEOUT = 5 * 60
+AUTH_TOKEN_CACHE_KEY = "auth_token:{digest}"
+
+PROFILING_SAMPLES_PER_VIEW = 1000
+PROFILING_DUPLICATE_THRESHOLD = 2
+PROFILING_TOP_DUPLICATES = 5
+PROFILING_REPORT_LIMIT = 20
+
+DB_CONNECT_SAMPLES = 1000
+DB_REPLICA_STICKY_KEY = "replica_sticky:{namespace}"
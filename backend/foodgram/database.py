@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from foodgram.const import DB_CONNECT_SAMPLES
+from foodgram.profiling import current_profile, percentile
+
+
+class ConnectionStats:
+    def __init__(self, samples=DB_CONNECT_SAMPLES):
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connects = Counter()
+        self._failures = Counter()
+        self._durations = {}
+
+    def record(self, alias, duration):
+        with self._lock:
+            self._connects[alias] += 1
+            self._durations.setdefault(alias, deque(maxlen=self.samples)).append(
+                duration
+            )
+
+    def record_failure(self, alias):
+        with self._lock:
+            self._failures[alias] += 1
+
+    def count_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def reset(self):
+        with self._lock:
+            self._requests = 0
+            self._connects.clear()
+            self._failures.clear()
+            self._durations.clear()
+
+    def report(self):
+        with self._lock:
+            requests = self._requests
+            connects = dict(self._connects)
+            failures = dict(self._failures)
+            durations = {
+                alias: list(samples) for alias, samples in self._durations.items()
+            }
+        return {
+            "requests": requests,
+            "aliases": {
+                alias: {
+                    "connects": connects[alias],
+                    "failed_health_checks": failures.get(alias, 0),
+                    "acquire_p50_ms": round(percentile(samples, 50) * 1000, 2),
+                    "acquire_p95_ms": round(percentile(samples, 95) * 1000, 2),
+                    "acquire_p99_ms": round(percentile(samples, 99) * 1000, 2),
+                    "acquire_max_ms": round(max(samples) * 1000, 2),
+                }
+                for alias, samples in durations.items()
+            },
+        }
+
+
+connection_stats = ConnectionStats()
+
+
+class InstrumentedDatabaseMixin:
+    connect_duration = None
+    health_check_pending = False
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        self.connect_duration = time.perf_counter() - started
+        return connection
+
+    def ensure_connection(self):
+        if self.health_check_pending:
+            self.health_check_pending = False
+            if self.connection is not None and not self.is_usable():
+                connection_stats.record_failure(self.alias)
+                self.close()
+        super().ensure_connection()
+
+
+def connection_opened(connection, **kwargs):
+    if connection.connect_duration is None:
+        return
+    connection_stats.record(connection.alias, connection.connect_duration)
+    profile = current_profile.get()
+    if profile is not None:
+        profile.connect_time += connection.connect_duration
+
+
+def schedule_health_checks():
+    if settings.DB_CONN_HEALTH_CHECKS:
+        for connection in connections.all():
+            connection.health_check_pending = True
+
+
+def start_request(**kwargs):
+    connection_stats.count_request()
+    schedule_health_checks()
+
+
+def instrument_connections():
+    request_started.connect(start_request, dispatch_uid="foodgram.database")
+    connection_created.connect(connection_opened, dispatch_uid="foodgram.database")
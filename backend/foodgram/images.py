@@ -0,0 +1,90 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connections, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from foodgram.const import (
+    IMAGE_PROCESSING_WORKERS,
+    IMAGE_VARIANT_EXTENSION,
+    IMAGE_VARIANT_FORMAT,
+    IMAGE_VARIANT_QUALITY,
+    IMAGE_VARIANTS,
+)
+
+logger = logging.getLogger(__name__)
+
+image_processed = Signal()
+
+executor = ThreadPoolExecutor(
+    max_workers=IMAGE_PROCESSING_WORKERS, thread_name_prefix="images"
+)
+
+
+def variant_name(name, variant):
+    root, _ = os.path.splitext(name)
+    return f"{root}_{variant}.{IMAGE_VARIANT_EXTENSION}"
+
+
+def variant_names(name):
+    return {variant: variant_name(name, variant) for variant in IMAGE_VARIANTS}
+
+
+def save_image(image, name, image_format, **params):
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **params)
+    temporary = default_storage.save(f"{name}.tmp", ContentFile(buffer.getvalue()))
+    os.replace(default_storage.path(temporary), default_storage.path(name))
+
+
+def process_image(name):
+    names = variant_names(name)
+    if all(default_storage.exists(path) for path in names.values()):
+        return
+    with default_storage.open(name) as f:
+        original = Image.open(f)
+        image_format = original.format
+        animated = getattr(original, "is_animated", False)
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    if not animated:
+        save_image(image, name, image_format, quality=90)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    for variant, size in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.LANCZOS)
+        save_image(
+            resized,
+            names[variant],
+            IMAGE_VARIANT_FORMAT,
+            quality=IMAGE_VARIANT_QUALITY,
+        )
+
+
+def run_process_image(name):
+    close_old_connections()
+    try:
+        process_image(name)
+        image_processed.send(sender=None, name=name)
+    except Exception:
+        logger.exception("Не удалось обработать изображение %s", name)
+    finally:
+        connections.close_all()
+
+
+def schedule_image_processing(field_file):
+    if field_file:
+        name = field_file.name
+        transaction.on_commit(lambda: executor.submit(run_process_image, name))
+
+
+def delete_image_variants(name):
+    for path in variant_names(name).values():
+        default_storage.delete(path)
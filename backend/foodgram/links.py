@@ -0,0 +1,117 @@
+from django.db import IntegrityError, connection, transaction
+
+CONFLICT_VENDORS = ("postgresql", "sqlite")
+SQLITE_RETURNING_VERSION = (3, 35)
+
+
+def supports_returning():
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= SQLITE_RETURNING_VERSION
+    return connection.vendor == "postgresql"
+
+
+def link_columns(model, names):
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    quote = connection.ops.quote_name
+    return (
+        quote(model._meta.db_table),
+        [quote(fields[name].column) for name in names],
+        [fields[name] for name in names],
+    )
+
+
+def prepare(fields, values):
+    return [
+        field.get_db_prep_value(value, connection)
+        for field, value in zip(fields, values)
+    ]
+
+
+def create_link(model, **values):
+    if connection.vendor not in CONFLICT_VENDORS:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([model(**values)])
+        except IntegrityError:
+            return False
+        return True
+
+    table, columns, fields = link_columns(model, values)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) ON CONFLICT DO NOTHING",
+            prepare(fields, values.values()),
+        )
+        return cursor.rowcount > 0
+
+
+def delete_link(model, **values):
+    table, columns, fields = link_columns(model, values)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} "
+            f"WHERE {' AND '.join(f'{column} = %s' for column in columns)}",
+            prepare(fields, values.values()),
+        )
+        return cursor.rowcount > 0
+
+
+def create_links(model, field, values, **common):
+    values = list(values)
+    if not values:
+        return set()
+    if not supports_returning():
+        with transaction.atomic():
+            existing = set(
+                model.objects.filter(**common, **{f"{field}__in": values})
+                .select_for_update()
+                .values_list(field, flat=True)
+            )
+            model.objects.bulk_create(
+                [
+                    model(**common, **{field: value})
+                    for value in values
+                    if value not in existing
+                ],
+                ignore_conflicts=True,
+            )
+        return set(values) - existing
+
+    table, columns, fields = link_columns(model, [*common, field])
+    row = f"({', '.join(['%s'] * len(columns))})"
+    params = []
+    for value in values:
+        params.extend(prepare(fields, [*common.values(), value]))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES {', '.join([row] * len(values))} "
+            f"ON CONFLICT DO NOTHING RETURNING {columns[-1]}",
+            params,
+        )
+        return {value for value, in cursor.fetchall()}
+
+
+def delete_links(model, field, values, **common):
+    values = list(values)
+    if not values:
+        return set()
+    table, columns, fields = link_columns(model, [*common, field])
+    conditions = [f"{column} = %s" for column in columns[:-1]]
+    conditions.append(f"{columns[-1]} IN ({', '.join(['%s'] * len(values))})")
+    params = prepare(fields, common.values()) + [
+        fields[-1].get_db_prep_value(value, connection) for value in values
+    ]
+    sql = f"DELETE FROM {table} WHERE {' AND '.join(conditions)}"
+    with transaction.atomic(), connection.cursor() as cursor:
+        if supports_returning():
+            cursor.execute(f"{sql} RETURNING {columns[-1]}", params)
+            return {value for value, in cursor.fetchall()}
+        existing = set(
+            model.objects.filter(**common, **{f"{field}__in": values})
+            .select_for_update()
+            .values_list(field, flat=True)
+        )
+        cursor.execute(sql, params)
+        return existing
@@ -0,0 +1,55 @@
+class CounterFieldsMixin:
+    counter_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_values()
+        return instance
+
+    def remember_values(self):
+        deferred = self.get_deferred_fields()
+        self._saved_values = {
+            field.attname: self.stored_value(field)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_values()
+
+    def stored_value(self, field):
+        return field.get_prep_value(field.value_from_object(self))
+
+    def changed_fields(self):
+        deferred = self.get_deferred_fields()
+        fields = [
+            field
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.name not in self.counter_fields
+            and field.attname not in deferred
+        ]
+        saved = getattr(self, "_saved_values", None)
+        if saved is None:
+            return [field.name for field in fields]
+        changed = [
+            field.name
+            for field in fields
+            if field.attname not in saved
+            or self.stored_value(field) != saved[field.attname]
+        ]
+        if changed:
+            changed.extend(
+                field.name
+                for field in fields
+                if getattr(field, "auto_now", False) and field.name not in changed
+            )
+        return changed
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = self.changed_fields()
+        super().save(*args, **kwargs)
+        self.remember_values()
@@ -0,0 +1,194 @@
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from statistics import quantiles
+
+from django.db import connections
+from rest_framework import serializers
+
+from foodgram.const import (
+    PROFILING_DUPLICATE_THRESHOLD,
+    PROFILING_SAMPLES_PER_VIEW,
+    PROFILING_TOP_DUPLICATES,
+)
+
+NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+WHITESPACE = re.compile(r"\s+")
+
+current_profile = ContextVar("current_profile", default=None)
+
+
+def fingerprint(sql):
+    sql = NUMBER.sub("?", sql)
+    sql = PLACEHOLDER_LIST.sub("%s...", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def percentile(values, point):
+    if len(values) == 1:
+        return values[0]
+    return quantiles(values, n=100, method="inclusive")[point - 1]
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.connect_time = 0.0
+        self.fingerprints = Counter()
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        return {
+            sql: count
+            for sql, count in self.fingerprints.items()
+            if count >= PROFILING_DUPLICATE_THRESHOLD
+        }
+
+
+class ProfileStore:
+    def __init__(self, samples=PROFILING_SAMPLES_PER_VIEW):
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._views = {}
+        self._duplicates = {}
+
+    def record(self, view, duration, profile, size):
+        sample = (
+            duration,
+            profile.queries,
+            profile.sql_time,
+            profile.serializer_time,
+            size,
+        )
+        with self._lock:
+            self._views.setdefault(view, deque(maxlen=self.samples)).append(sample)
+            self._duplicates.setdefault(view, Counter()).update(profile.duplicates())
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self._duplicates.clear()
+
+    def report(self, limit=None):
+        with self._lock:
+            views = {view: list(samples) for view, samples in self._views.items()}
+            duplicates = {
+                view: counter.most_common(PROFILING_TOP_DUPLICATES)
+                for view, counter in self._duplicates.items()
+            }
+        rows = []
+        for view, samples in views.items():
+            durations, queries, sql_times, serializer_times, sizes = zip(*samples)
+            rows.append(
+                {
+                    "view": view,
+                    "requests": len(samples),
+                    "p50_ms": round(percentile(durations, 50) * 1000, 2),
+                    "p95_ms": round(percentile(durations, 95) * 1000, 2),
+                    "p99_ms": round(percentile(durations, 99) * 1000, 2),
+                    "queries_p50": percentile(queries, 50),
+                    "queries_max": max(queries),
+                    "sql_p95_ms": round(percentile(sql_times, 95) * 1000, 2),
+                    "serializer_p95_ms": round(
+                        percentile(serializer_times, 95) * 1000, 2
+                    ),
+                    "size_p95": percentile(sizes, 95),
+                    "duplicates": [
+                        {"sql": sql, "count": count}
+                        for sql, count in duplicates.get(view, ())
+                    ],
+                }
+            )
+        rows.sort(key=lambda row: row["p95_ms"], reverse=True)
+        return rows[:limit]
+
+
+profile_store = ProfileStore()
+
+
+def timed_data(prop):
+    def data(self):
+        profile = current_profile.get()
+        if profile is None or profile.serializing:
+            return prop.fget(self)
+        profile.serializing = True
+        started = time.perf_counter()
+        try:
+            return prop.fget(self)
+        finally:
+            profile.serializer_time += time.perf_counter() - started
+            profile.serializing = False
+
+    data.instrumented = True
+    return property(data)
+
+
+def instrument_serializers():
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(serializer_class.data.fget, "instrumented", False):
+            serializer_class.data = timed_data(serializer_class.data)
+
+
+def server_timing(duration, profile):
+    return ", ".join(
+        (
+            f'db;dur={profile.sql_time * 1000:.2f};desc="{profile.queries} queries"',
+            f'dup;desc="{sum(profile.duplicates().values())} repeated"',
+            f"conn;dur={profile.connect_time * 1000:.2f}",
+            f"serialize;dur={profile.serializer_time * 1000:.2f}",
+            f"total;dur={duration * 1000:.2f}",
+        )
+    )
+
+
+@contextmanager
+def profiled_connections():
+    profile = current_profile.get()
+    with ExitStack() as stack:
+        if profile is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+        yield
+
+
+class QueryProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_serializers()
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with profiled_connections():
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        duration = time.perf_counter() - started
+
+        response["Server-Timing"] = server_timing(duration, profile)
+        match = request.resolver_match
+        if match is not None:
+            profile_store.record(
+                f"{request.method} {match.view_name}",
+                duration,
+                profile,
+                0 if response.streaming else len(response.content),
+            )
+        return response
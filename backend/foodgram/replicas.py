@@ -0,0 +1,51 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from foodgram.cache import is_sticky, mark_sticky, user_state_namespace
+
+replica_alias = ContextVar("replica_alias", default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = replica_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+def sticky_namespaces(user, namespace):
+    if user is not None and user.is_authenticated:
+        return [user_state_namespace(user.pk)]
+    return [namespace] if namespace else []
+
+
+class ReplicaReadMixin:
+    def dispatch(self, request, *args, **kwargs):
+        token = replica_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            replica_alias.reset(token)
+            if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS:
+                mark_sticky(*sticky_namespaces(getattr(request, "user", None), None))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+            return
+        namespaces = sticky_namespaces(
+            request.user, getattr(self, "cache_namespace", None)
+        )
+        if not namespaces or not is_sticky(*namespaces):
+            replica_alias.set(random.choice(settings.DATABASE_REPLICAS))
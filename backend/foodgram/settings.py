@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management.utils import get_random_secret_key
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -40,6 +41,17 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+QUERY_PROFILING = os.getenv("QUERY_PROFILING", default="False").lower() in (
+    "true",
+    "1",
+)
+if QUERY_PROFILING:
+    MIDDLEWARE.insert(0, "foodgram.profiling.QueryProfilingMiddleware")
+
+SERVER_MODE = os.getenv("SERVER_MODE", default="wsgi")
+ASYNC_VIEWS = SERVER_MODE == "asgi"
+ASYNC_VIEW_THREADS = int(os.getenv("ASYNC_VIEW_THREADS", default=16))
+
 ROOT_URLCONF = "foodgram.urls"
 
 TEMPLATES = [
@@ -60,25 +72,78 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "foodgram.wsgi.application"
 
+DB_BACKENDS = {
+    "django.db.backends.postgresql": "foodgram.backends.postgresql",
+    "django.db.backends.sqlite3": "foodgram.backends.sqlite3",
+}
+DB_ENGINE = os.getenv("DB_ENGINE", default="django.db.backends.sqlite3")
+
 DATABASES = {
     "default": {
-        "ENGINE": os.getenv("DB_ENGINE", default="django.db.backends.sqlite3"),
+        "ENGINE": DB_BACKENDS.get(DB_ENGINE, DB_ENGINE),
         "NAME": os.getenv("DB_NAME", default=(BASE_DIR / "db.sqlite3")),
         "USER": os.getenv("POSTGRES_USER", default=None),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", default=None),
         "HOST": os.getenv("DB_HOST", default=None),
         "PORT": os.getenv("DB_PORT", default=None),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", default=60)),
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv("DB_POOLER") == "pgbouncer",
     }
 }
 
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", default="True").lower() in (
+    "true",
+    "1",
+)
+
 if DEBUG:
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.sqlite3",
+            "ENGINE": "foodgram.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
 
+if DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    DATABASES["default"]["TEST"] = {"NAME": BASE_DIR / "test_db.sqlite3"}
+
+DB_REPLICAS = os.getenv("DB_REPLICAS", default="")
+for number, location in enumerate(filter(None, DB_REPLICAS.split(",")), start=1):
+    replica = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    if replica["ENGINE"].endswith("sqlite3"):
+        replica["NAME"] = location
+    else:
+        replica["HOST"], _, port = location.partition(":")
+        replica["PORT"] = port or replica["PORT"]
+    DATABASES[f"replica{number}"] = replica
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["foodgram.replicas.ReplicaRouter"]
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", default=10))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+
+SHARED_CACHE = bool(os.getenv("REDIS_URL"))
+AUTH_TOKEN_SHARED_CACHE = SHARED_CACHE
+
+if DATABASE_REPLICAS and not SHARED_CACHE:
+    raise ImproperlyConfigured(
+        "DB_REPLICAS требует общий кеш для привязки чтений к основной базе: "
+        "задайте REDIS_URL"
+    )
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -123,7 +188,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
     ],
 }
 
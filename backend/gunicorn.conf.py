@@ -0,0 +1,9 @@
+import os
+
+server_mode = os.getenv("SERVER_MODE", "wsgi")
+
+wsgi_app = f"foodgram.{server_mode}:application"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 1))
+if server_mode == "asgi":
+    worker_class = "uvicorn.workers.UvicornWorker"
@@ -6,13 +6,10 @@ from recipes.models import Favorite, Ingredient, Recipe, RecipeIngredient, Shopp
 
 @register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ("pk", "name", "author", "favorites_count")
+    list_display = ("pk", "name", "author", "favorites_count", "in_carts_count")
+    list_select_related = ("author",)
     search_fields = ("name", "author__username", "author__email")
 
-    @admin.display(description="Добавлений в избранное")
-    def favorites_count(self, obj):
-        return obj.favorites.count()
-
 
 @register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
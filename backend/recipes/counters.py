@@ -0,0 +1,39 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Favorite, Recipe, ShoppingCart, User
+
+COUNTERS = (
+    (Recipe, "favorites_count", Favorite, "recipe"),
+    (Recipe, "in_carts_count", ShoppingCart, "recipe"),
+    (User, "recipes_count", Recipe, "author"),
+    (User, "subscribers_count", User.subscriptions.through, "to_user"),
+)
+
+
+def count_of(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def change_counter(model, pk, field, delta):
+    model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+
+
+def reconcile_counters():
+    drift = {}
+    for model, field, related_model, related_field in COUNTERS:
+        actual = count_of(related_model, related_field)
+        stale = model.objects.annotate(actual=actual).exclude(**{field: F("actual")})
+        drift[f"{model.__name__}.{field}"] = model.objects.filter(
+            pk__in=stale.values("pk")
+        ).update(**{field: actual})
+    return drift
@@ -0,0 +1,46 @@
+import csv
+
+from django.db.models import F
+
+from foodgram.const import SHOPPING_LIST_CHUNK_SIZE
+
+from .models import ShoppingListItem
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def shopping_list(user):
+    return (
+        ShoppingListItem.objects.filter(user=user)
+        .values(
+            name=F("ingredient__name"),
+            unit=F("ingredient__measurement_unit"),
+            total_amount=F("amount"),
+        )
+        .order_by("name")
+    )
+
+
+def shopping_list_rows(user):
+    return shopping_list(user).iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+
+
+def render_txt(rows):
+    for item in rows:
+        yield f"{item['name']} ({item['unit']}) — {item['total_amount']}\n"
+
+
+def render_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(("Ингредиент", "Единица измерения", "Количество"))
+    for item in rows:
+        yield writer.writerow((item["name"], item["unit"], item["total_amount"]))
+
+
+SHOPPING_LIST_RENDERERS = {
+    "txt": (render_txt, "text/plain; charset=utf-8"),
+    "csv": (render_csv, "text/csv; charset=utf-8"),
+}
@@ -2,6 +2,7 @@ import django_filters
 from django_filters import rest_framework as filters
 
 from .models import Ingredient, Recipe
+from .search import search_recipes
 
 
 class IngredientFilter(filters.FilterSet):
@@ -15,6 +16,7 @@ class IngredientFilter(filters.FilterSet):
 class RecipeFilter(filters.FilterSet):
     is_favorited = filters.BooleanFilter(method="filter_favorites")
     is_in_shopping_cart = filters.BooleanFilter(method="filter_shopping_cart")
+    search = filters.CharFilter(method="filter_search")
 
     def filter_favorites(self, queryset, name, value):
         user = getattr(self.request, "user", None)
@@ -36,10 +38,14 @@ class RecipeFilter(filters.FilterSet):
             return queryset.filter(shopping_cart__user=user)
         return queryset.exclude(shopping_cart__user=user)
 
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
     class Meta:
         model = Recipe
         fields = (
             "author",
             "is_favorited",
             "is_in_shopping_cart",
+            "search",
         )
@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+
+from foodgram.const import INDEX_FRESHNESS_CHECK_INTERVAL, INDEX_MAX_AGE
+
+
+class IndexFreshness:
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.loaded_at = None
+        self.checked_at = None
+        self.state = None
+
+    def loaded(self, state):
+        self.loaded_at = self.checked_at = time.monotonic()
+        self.state = state
+
+    def stale(self):
+        if self.loaded_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.loaded_at > INDEX_MAX_AGE:
+            return True
+        if (
+            settings.SHARED_CACHE
+            or now - self.checked_at < INDEX_FRESHNESS_CHECK_INTERVAL
+        ):
+            return False
+        self.checked_at = now
+        return self.fingerprint() != self.state
@@ -0,0 +1,79 @@
+import threading
+import uuid
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Max
+
+from foodgram.const import INGREDIENT_INDEX_VERSION_KEY
+
+from .index_freshness import IndexFreshness
+from .models import Ingredient
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._snapshot = None
+        self._freshness = IndexFreshness(self._fingerprint)
+
+    def _fingerprint(self):
+        return Ingredient.objects.using(DEFAULT_DB_ALIAS).aggregate(
+            total=Count("pk"), last=Max("pk")
+        )
+
+    def _load(self):
+        version = cache.get(INGREDIENT_INDEX_VERSION_KEY)
+        loaded_at = self._freshness.loaded_at
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and version == self._version
+            and not self._freshness.stale()
+        ):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or self._freshness.loaded_at == loaded_at:
+                state = self._fingerprint()
+                rows = sorted(
+                    (name.casefold(), pk, name, unit)
+                    for pk, name, unit in Ingredient.objects.using(
+                        DEFAULT_DB_ALIAS
+                    ).values_list("pk", "name", "measurement_unit")
+                )
+                snapshot = (
+                    tuple(row[0] for row in rows),
+                    tuple(
+                        {"id": pk, "name": name, "measurement_unit": unit}
+                        for _, pk, name, unit in rows
+                    ),
+                    frozenset(row[1] for row in rows),
+                )
+                self._snapshot = snapshot
+                self._version = version
+                self._freshness.loaded(state)
+        return snapshot
+
+    def search(self, prefix=""):
+        keys, items, _ = self._load()
+        if not prefix:
+            return items
+        prefix = prefix.casefold()
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + chr(0x10FFFF), start)
+        return items[start:end]
+
+    def missing(self, ids):
+        _, _, known = self._load()
+        return [pk for pk in ids if pk not in known]
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+        cache.set(INGREDIENT_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,19 @@
+from django.db.models import F
+
+from foodgram.cache import invalidate_user_state
+
+from .models import Favorite, Recipe, ShoppingCart
+from .shopping_lists import add_recipes, remove_recipes
+
+LINK_COUNTERS = {
+    Favorite: "favorites_count",
+    ShoppingCart: "in_carts_count",
+}
+
+
+def change_recipe_links(model, user_id, recipe_ids, delta):
+    counter = LINK_COUNTERS[model]
+    Recipe.objects.filter(pk__in=recipe_ids).update(**{counter: F(counter) + delta})
+    if model is ShoppingCart:
+        (add_recipes if delta > 0 else remove_recipes)(user_id, recipe_ids)
+    invalidate_user_state(user_id)
@@ -0,0 +1,199 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from rest_framework.authtoken.models import Token
+
+from foodgram.profiling import percentile
+from recipes.models import Ingredient, Recipe
+from users.models import User
+
+SKIPPED_ROUTES = {"api-root", "logout", "profiling"}
+WRITE_ROUTES = ("recipes-favorite", "recipes-shopping-cart-change", "users-subscribe")
+
+
+def api_routes():
+    routes = {}
+    reverse_dict = get_resolver().namespace_dict["api"][1].reverse_dict
+    for name, possibilities in reverse_dict.items():
+        if not isinstance(name, str) or name in SKIPPED_ROUTES:
+            continue
+        template, params = possibilities[0][0]
+        if "format" in params:
+            continue
+        routes.setdefault(template.replace("%(id)s", "%(pk)s"), (name, template))
+    return sorted(routes.values())
+
+
+def summary(name, method, path, status, durations, queries):
+    total = sum(durations)
+    return {
+        "name": name,
+        "method": method,
+        "path": path,
+        "status": status,
+        "requests": len(durations),
+        "rps": round(len(durations) / total, 1) if total else None,
+        "p50_ms": round(percentile(durations, 50) * 1000, 2),
+        "p95_ms": round(percentile(durations, 95) * 1000, 2),
+        "p99_ms": round(percentile(durations, 99) * 1000, 2),
+        "queries": queries,
+    }
+
+
+class Command(BaseCommand):
+    help = "Measure throughput, latency percentiles and query counts of API endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--anonymous", action="store_true")
+        parser.add_argument("--writes", action="store_true")
+        parser.add_argument("--output")
+        parser.add_argument("--baseline")
+
+    def handle(self, *args, **options):
+        self.headers = {"HTTP_HOST": options["host"]}
+        self.client = Client()
+        self.requests = options["requests"]
+        self.skipped_statuses = {401, 404, 405} if options["anonymous"] else {404, 405}
+        with transaction.atomic():
+            user = self.get_user(options["prefix"])
+            if not options["anonymous"]:
+                token, _ = Token.objects.get_or_create(user=user)
+                self.headers["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+            values = self.route_values(user)
+            results = [
+                result
+                for name, template in api_routes()
+                for result in self.measure_route(name, template, values)
+            ]
+            if options["writes"] and not options["anonymous"]:
+                for name, template in api_routes():
+                    if name in WRITE_ROUTES:
+                        results.extend(self.measure_toggle(name, template, values))
+            transaction.set_rollback(True)
+
+        report = {
+            "requests": self.requests,
+            "anonymous": options["anonymous"],
+            "users": User.objects.count(),
+            "recipes": Recipe.objects.count(),
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        if options["baseline"]:
+            self.compare(options["baseline"], results)
+
+    def get_user(self, prefix):
+        user = User.objects.filter(username__startswith=prefix).order_by("pk").first()
+        if user is None:
+            raise CommandError(
+                f"Пользователи с префиксом {prefix} не найдены, выполните generate_data"
+            )
+        return user
+
+    def route_values(self, user):
+        recipe = Recipe.objects.exclude(author=user).order_by("pk").first()
+        author = User.objects.exclude(pk=user.pk).order_by("pk").first()
+        ingredients = list(
+            Ingredient.objects.order_by("pk").values_list("pk", flat=True)[:5]
+        )
+        if recipe is None or author is None or not ingredients:
+            raise CommandError("Недостаточно данных, выполните generate_data")
+        return {
+            "recipes": recipe.pk,
+            "ingredients": ingredients[0],
+            "users": author.pk,
+            "user": author.pk,
+            "query": {
+                "recipes-match": "?ingredients=" + ",".join(map(str, ingredients)),
+                "ingredients-list": "?name=а",
+            },
+        }
+
+    def path(self, name, template, values):
+        kwargs = {
+            param: values[name.split("-")[0]]
+            for param in ("pk", "id")
+            if f"%({param})s" in template
+        }
+        return f"/api/{template % kwargs}{values['query'].get(name, '')}"
+
+    def send(self, method, path, expected=None):
+        response = getattr(self.client, method.lower())(path, **self.headers)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        if response.status_code in self.skipped_statuses and expected is None:
+            return response
+        if not 200 <= response.status_code < 300 or (
+            expected is not None and response.status_code != expected
+        ):
+            raise CommandError(f"{method} {path} вернул {response.status_code}")
+        return response
+
+    def measure_route(self, name, template, values):
+        path = self.path(name, template, values)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.send("GET", path)
+        queries = len(captured)
+        if response.status_code in self.skipped_statuses:
+            return []
+        durations = []
+        for _ in range(self.requests):
+            started = time.perf_counter()
+            self.send("GET", path, response.status_code)
+            durations.append(time.perf_counter() - started)
+        return [summary(name, "GET", path, response.status_code, durations, queries)]
+
+    def measure_toggle(self, name, template, values):
+        path = self.path(name, template, values)
+        self.client.delete(path, **self.headers)
+        expected = {"POST": 201, "DELETE": 204}
+        timings = {"POST": [], "DELETE": []}
+        queries = {}
+        for _ in range(self.requests):
+            for method in timings:
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    self.send(method, path, expected[method])
+                    timings[method].append(time.perf_counter() - started)
+                queries[method] = len(captured)
+        return [
+            summary(name, method, path, expected[method], durations, queries[method])
+            for method, durations in timings.items()
+        ]
+
+    def compare(self, baseline, results):
+        try:
+            with open(baseline, encoding="utf-8") as file:
+                previous = {
+                    (row["method"], row["name"]): row
+                    for row in json.load(file)["results"]
+                }
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f"Не удалось прочитать {baseline}: {error}")
+        for row in results:
+            old = previous.get((row["method"], row["name"]))
+            if old is None:
+                continue
+            change = "n/a"
+            if old["p95_ms"]:
+                change = (
+                    f"{(row['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:+.0f}%"
+                )
+            self.stderr.write(
+                f"{row['method']} {row['name']}: "
+                f"p95 {old['p95_ms']} -> {row['p95_ms']}ms ({change}), "
+                f"queries {old['queries']} -> {row['queries']}",
+                style_func=lambda message: message,
+            )
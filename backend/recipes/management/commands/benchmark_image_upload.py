@@ -0,0 +1,91 @@
+import base64
+import os
+import subprocess
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from drf_extra_fields.fields import Base64ImageField as LegacyBase64ImageField
+from PIL import Image
+
+from api.fields import Base64ImageField
+
+FIELDS = {
+    "drf_extra_fields": LegacyBase64ImageField,
+    "streaming": Base64ImageField,
+}
+
+
+def make_payload(side):
+    image = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def memory_status(key):
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith(f"{key}:"):
+            return int(line.split()[1]) * 1024
+    raise CommandError(f"В /proc/self/status нет {key}")
+
+
+def measure(field, payload):
+    Path("/proc/self/clear_refs").write_text("5")
+    baseline = memory_status("VmRSS")
+    upload = field.to_internal_value(payload)
+    for _ in upload.chunks():
+        pass
+    return baseline, memory_status("VmHWM")
+
+
+class Command(BaseCommand):
+    help = "Measure peak RSS of base64 image decoding per upload"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--side", type=int, default=1600)
+        parser.add_argument("--payload")
+        parser.add_argument("--field", choices=FIELDS)
+
+    def handle(self, *args, **options):
+        if options["payload"]:
+            with open(options["payload"], encoding="ascii") as file:
+                payload = file.read()
+            baseline, peak = measure(FIELDS[options["field"]](), payload)
+            self.stdout.write(f"{baseline} {peak}")
+            return
+
+        with tempfile.NamedTemporaryFile("w", suffix=".b64") as file:
+            file.write(make_payload(options["side"]))
+            file.flush()
+            size = file.tell()
+            self.stdout.write(f"payload: {size / 2**20:.1f} MiB of base64")
+            for label in FIELDS:
+                baseline, peak = self.run_isolated(file.name, label)
+                self.stdout.write(
+                    f"{label}: peak RSS {peak / 2**20:.1f} MiB, "
+                    f"+{(peak - baseline) / 2**20:.1f} MiB over baseline"
+                )
+
+    def run_isolated(self, path, label):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "manage.py",
+                "benchmark_image_upload",
+                "--payload",
+                path,
+                "--field",
+                label,
+            ],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Замер {label} завершился с ошибкой:\n{result.stderr}")
+        baseline, peak = map(int, result.stdout.split())
+        return baseline, peak
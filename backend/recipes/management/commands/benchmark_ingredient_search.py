@@ -0,0 +1,51 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.filters import IngredientFilter
+from recipes.ingredient_index import ingredient_index
+from recipes.models import Ingredient
+
+
+def percentiles(timings):
+    points = statistics.quantiles(timings, n=100)
+    return points[49] * 1000, points[98] * 1000
+
+
+class Command(BaseCommand):
+    help = "Compare ingredient prefix search in the database and in memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        names = list(Ingredient.objects.values_list("name", flat=True))
+        if not names:
+            self.stderr.write(self.style.ERROR("No ingredients, run load_ingredients"))
+            return
+
+        rng = random.Random(options["seed"])
+        prefixes = []
+        for _ in range(options["iterations"]):
+            name = rng.choice(names)
+            prefixes.append(name[: rng.randint(1, min(len(name), 4))])
+
+        ingredient_index.search()
+        backends = {
+            "database": lambda prefix: list(
+                IngredientFilter({"name": prefix}, Ingredient.objects.all())
+                .qs.values("id", "name", "measurement_unit")
+            ),
+            "index": ingredient_index.search,
+        }
+        for label, search in backends.items():
+            timings = []
+            for prefix in prefixes:
+                started = time.perf_counter()
+                search(prefix)
+                timings.append(time.perf_counter() - started)
+            p50, p99 = percentiles(timings)
+            self.stdout.write(f"{label}: p50={p50:.3f}ms p99={p99:.3f}ms")
@@ -0,0 +1,114 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast
+
+from recipes.match_index import RecipeMatchIndex
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from users.models import User
+
+BATCH_SIZE = 1000
+
+
+def match_in_database(ingredient_ids, limit):
+    return list(
+        Recipe.objects.annotate(
+            matched=Count(
+                "recipe_ingredients",
+                filter=Q(recipe_ingredients__ingredient_id__in=ingredient_ids),
+            ),
+            total=Count("recipe_ingredients"),
+        )
+        .filter(matched__gt=0)
+        .annotate(
+            coverage=Cast("matched", FloatField()) / Cast("total", FloatField())
+        )
+        .order_by(F("coverage").desc(), "-matched", "-pk")
+        .values_list("pk", "matched", "total")[:limit]
+    )
+
+
+class Command(BaseCommand):
+    help = "Compare ingredient coverage matching in the database and in memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=100_000)
+        parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+        parser.add_argument("--pantry", type=int, default=10)
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        ingredients = list(Ingredient.objects.values_list("pk", flat=True))
+        if len(ingredients) < options["ingredients_per_recipe"]:
+            self.stderr.write(self.style.ERROR("No ingredients, run load_ingredients"))
+            return
+        rng = random.Random(options["seed"])
+        popular = ingredients[: max(len(ingredients) // 20, 1)]
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.generate(rng, ingredients, popular, options)
+            self.stdout.write(
+                f"generated {options['recipes']} recipes "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+            index = RecipeMatchIndex()
+            started = time.perf_counter()
+            index.match((), 1)
+            self.stdout.write(
+                f"index loaded in {time.perf_counter() - started:.1f}s"
+            )
+            pantries = [
+                rng.sample(popular, min(len(popular), options["pantry"] // 2))
+                + rng.sample(ingredients, options["pantry"] // 2)
+                for _ in range(options["queries"])
+            ]
+            backends = {"database": match_in_database, "index": index.match}
+            for label, match in backends.items():
+                timings = []
+                for pantry in pantries:
+                    started = time.perf_counter()
+                    match(pantry, options["limit"])
+                    timings.append(time.perf_counter() - started)
+                points = statistics.quantiles(timings, n=100)
+                self.stdout.write(
+                    f"{label}: p50={points[49] * 1000:.2f}ms "
+                    f"p99={points[98] * 1000:.2f}ms"
+                )
+            transaction.set_rollback(True)
+
+    def generate(self, rng, ingredients, popular, options):
+        author = User.objects.create(
+            username="match-benchmark", email="match-benchmark@example.com"
+        )
+        total = options["recipes"]
+        per_recipe = options["ingredients_per_recipe"]
+        for offset in range(0, total, BATCH_SIZE):
+            size = min(BATCH_SIZE, total - offset)
+            Recipe.objects.bulk_create(
+                Recipe(
+                    author=author,
+                    name=f"Рецепт {offset + number}",
+                    text="",
+                    cooking_time=rng.randint(1, 180),
+                    image="recipes/images/benchmark.png",
+                )
+                for number in range(size)
+            )
+            recipe_ids = Recipe.objects.filter(author=author).order_by(
+                "-pk"
+            ).values_list("pk", flat=True)[:size]
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe_id=recipe_id, ingredient_id=pk, amount=1)
+                for recipe_id in recipe_ids
+                for pk in set(
+                    rng.sample(popular, min(len(popular), per_recipe // 2))
+                    + rng.sample(ingredients, per_recipe - per_recipe // 2)
+                )
+            )
@@ -0,0 +1,85 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.search import search_recipes, update_search_index
+from users.models import User
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Compare ranked full-text recipe search with icontains on synthetic data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipes", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        ingredients = list(Ingredient.objects.values_list("pk", "name"))
+        if not ingredients:
+            self.stderr.write(self.style.ERROR("No ingredients, run load_ingredients"))
+            return
+        rng = random.Random(options["seed"])
+        words = sorted({word for _, name in ingredients for word in name.split()})
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.generate(rng, ingredients, words, options["recipes"])
+            self.stdout.write(
+                f"generated {options['recipes']} recipes "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+            queries = [rng.choice(words) for _ in range(options["queries"])]
+            backends = {
+                "icontains": lambda value: Recipe.objects.filter(
+                    Q(name__icontains=value) | Q(text__icontains=value)
+                ),
+                "full-text": lambda value: search_recipes(Recipe.objects.all(), value),
+            }
+            for label, search in backends.items():
+                timings = []
+                for value in queries:
+                    started = time.perf_counter()
+                    list(search(value).values_list("pk", flat=True)[:10])
+                    timings.append(time.perf_counter() - started)
+                points = statistics.quantiles(timings, n=100)
+                self.stdout.write(
+                    f"{label}: p50={points[49] * 1000:.2f}ms "
+                    f"p99={points[98] * 1000:.2f}ms"
+                )
+            transaction.set_rollback(True)
+
+    def generate(self, rng, ingredients, words, total):
+        author = User.objects.create(
+            username="search-benchmark", email="search-benchmark@example.com"
+        )
+        for offset in range(0, total, BATCH_SIZE):
+            size = min(BATCH_SIZE, total - offset)
+            Recipe.objects.bulk_create(
+                Recipe(
+                    author=author,
+                    name=" ".join(rng.sample(words, 3)),
+                    text=" ".join(rng.choices(words, k=40)),
+                    cooking_time=rng.randint(1, 180),
+                    image="recipes/images/benchmark.png",
+                )
+                for _ in range(size)
+            )
+            recipe_ids = list(
+                Recipe.objects.filter(author=author)
+                .order_by("-pk")
+                .values_list("pk", flat=True)[:size]
+            )
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe_id=recipe_id, ingredient_id=pk, amount=1)
+                for recipe_id in recipe_ids
+                for pk, _ in rng.sample(ingredients, 5)
+            )
+            update_search_index(recipe_ids)
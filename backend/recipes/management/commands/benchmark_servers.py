@@ -0,0 +1,162 @@
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from pathlib import Path
+from urllib.error import URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from foodgram.profiling import percentile
+from recipes.models import Recipe, ShoppingCart
+
+MODES = ("wsgi", "asgi")
+PATHS = (
+    "/api/recipes/{recipe}/",
+    "/api/ingredients/?name=а",
+    "/api/recipes/download_shopping_cart/",
+)
+
+
+def process_tree(pid):
+    pids = {pid}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            pids.add(int(stat.parent.name))
+    return pids
+
+
+def rss_mb(pid):
+    total = 0
+    for child in process_tree(pid):
+        try:
+            status = Path(f"/proc/{child}/status").read_text()
+        except OSError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1])
+    return round(total / 1024, 1)
+
+
+class Command(BaseCommand):
+    help = "Compare concurrency and memory of WSGI and ASGI gunicorn workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+        parser.add_argument("--requests", type=int, default=300)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--output")
+
+    def handle(self, *args, **options):
+        cart = ShoppingCart.objects.order_by("user_id").first()
+        recipe = Recipe.objects.order_by("pk").first()
+        if cart is None or recipe is None:
+            raise CommandError("Недостаточно данных, выполните generate_data")
+        token, created = Token.objects.get_or_create(user_id=cart.user_id)
+        self.base = f"http://127.0.0.1:{options['port']}"
+        self.headers = {
+            "Host": settings.ALLOWED_HOSTS[0] or "localhost",
+            "Authorization": f"Token {token.key}",
+        }
+        self.paths = [
+            quote(path.format(recipe=recipe.pk), safe="/?=&") for path in PATHS
+        ]
+        results = []
+        try:
+            for mode in MODES:
+                results.extend(self.benchmark(mode, options))
+        finally:
+            if created:
+                token.delete()
+
+        report = {"workers": options["workers"], "results": results}
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+
+    def benchmark(self, mode, options):
+        server = subprocess.Popen(
+            ["gunicorn"],
+            cwd=settings.BASE_DIR,
+            env={
+                **os.environ,
+                "SERVER_MODE": mode,
+                "GUNICORN_BIND": f"127.0.0.1:{options['port']}",
+                "GUNICORN_WORKERS": str(options["workers"]),
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self.wait_ready()
+            for path in self.paths:
+                self.fetch(path)
+            return [
+                self.load(mode, concurrency, options["requests"], server.pid)
+                for concurrency in options["concurrency"]
+            ]
+        finally:
+            server.terminate()
+            server.wait()
+
+    def wait_ready(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                self.fetch(self.paths[0])
+                return
+            except (URLError, ConnectionError):
+                time.sleep(0.2)
+        raise CommandError("Сервер не запустился")
+
+    def fetch(self, path):
+        started = time.perf_counter()
+        with urlopen(Request(self.base + path, headers=self.headers)) as response:
+            response.read()
+        return time.perf_counter() - started
+
+    def attempt(self, path):
+        try:
+            return self.fetch(path)
+        except (URLError, ConnectionError):
+            return None
+
+    def load(self, mode, concurrency, requests, pid):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            durations = list(
+                pool.map(self.attempt, islice(cycle(self.paths), requests))
+            )
+        elapsed = time.perf_counter() - started
+        succeeded = [duration for duration in durations if duration is not None]
+        row = {
+            "mode": mode,
+            "concurrency": concurrency,
+            "requests": requests,
+            "errors": requests - len(succeeded),
+            "rps": round(len(succeeded) / elapsed, 1),
+            "rss_mb": rss_mb(pid),
+        }
+        if succeeded:
+            for point in (50, 95, 99):
+                row[f"p{point}_ms"] = round(percentile(succeeded, point) * 1000, 2)
+        self.stderr.write(
+            f"{mode} c={concurrency}: {row['rps']} req/s, "
+            f"p95={row.get('p95_ms')}ms, rss={row['rss_mb']}MB",
+            style_func=lambda message: message,
+        )
+        return row
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.views import APIView
+
+from api.authentication import CachedTokenAuthentication, token_cache
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Compare request throughput with plain and cached token authentication"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--path", default="/api/users/me/")
+
+    def handle(self, *args, **options):
+        default_classes = APIView.authentication_classes
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username="auth-benchmark", email="auth-benchmark@example.com"
+            )
+            token = Token.objects.create(user=user)
+            client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+            try:
+                for label, authentication in (
+                    ("token", TokenAuthentication),
+                    ("cached", CachedTokenAuthentication),
+                ):
+                    APIView.authentication_classes = [authentication]
+                    token_cache.clear()
+                    client.get(options["path"], HTTP_HOST="localhost")
+                    started = time.perf_counter()
+                    for _ in range(options["requests"]):
+                        client.get(options["path"], HTTP_HOST="localhost")
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{label}: {options['requests'] / elapsed:.0f} req/s"
+                    )
+            finally:
+                APIView.authentication_classes = default_classes
+                token_cache.clear()
+            transaction.set_rollback(True)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from foodgram.const import SHOPPING_LIST_CHUNK_SIZE
+from recipes.shopping_lists import refresh_shopping_lists, shopping_list_drift
+
+
+class Command(BaseCommand):
+    help = "Compare materialized shopping lists with shopping carts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true")
+
+    def handle(self, *args, **options):
+        users = shopping_list_drift()
+        if not users:
+            self.stdout.write(self.style.SUCCESS("Shopping lists are consistent."))
+            return
+        if not options["fix"]:
+            raise CommandError(
+                f"Списки покупок расходятся с корзинами у {len(users)} пользователей"
+            )
+        with transaction.atomic():
+            for start in range(0, len(users), SHOPPING_LIST_CHUNK_SIZE):
+                refresh_shopping_lists(users[start : start + SHOPPING_LIST_CHUNK_SIZE])
+        self.stdout.write(
+            self.style.SUCCESS(f"Shopping lists rebuilt for {len(users)} users.")
+        )
@@ -0,0 +1,98 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from recipes.exports import shopping_list
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart
+from users.models import User
+
+SEQUENTIAL_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (\w+)"),
+}
+ALIAS = re.compile(r'"(\w+)" (U\d+)')
+
+
+def hot_queries(user, author, recipe):
+    yield (
+        "favorites",
+        Recipe.objects.filter(favorites__user=user),
+        {"recipes_favorite"},
+    )
+    yield (
+        "shopping_cart",
+        Recipe.objects.filter(shopping_cart__user=user),
+        {"recipes_shoppingcart"},
+    )
+    yield (
+        "user_flags",
+        Recipe.objects.filter(pk=recipe.pk).with_user_flags(user),
+        {"recipes_favorite", "recipes_shoppingcart"},
+    )
+    yield (
+        "author_recipes",
+        Recipe.objects.filter(author=author).order_by("-created", "-id"),
+        {"recipes_recipe"},
+    )
+    yield (
+        "limit_per_author",
+        Recipe.objects.filter(author=author).limit_per_author(3),
+        {"recipes_recipe"},
+    )
+    yield (
+        "ingredient_prefix",
+        Ingredient.objects.filter(name__istartswith="мол"),
+        {"recipes_ingredient"},
+    )
+    yield (
+        "shopping_list",
+        shopping_list(user),
+        {"recipes_shoppinglistitem"},
+    )
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN hot queries and fail if they fall back to sequential scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plans", action="store_true")
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SEQUENTIAL_SCAN:
+            raise CommandError(f"EXPLAIN для {connection.vendor} не поддерживается")
+        favorite = Favorite.objects.order_by("pk").first()
+        cart = ShoppingCart.objects.order_by("pk").first()
+        recipe = Recipe.objects.order_by("pk").first()
+        if favorite is None or cart is None or recipe is None:
+            raise CommandError("Недостаточно данных, выполните generate_data")
+        user = User.objects.get(pk=cart.user_id)
+        author = User.objects.get(pk=recipe.author_id)
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        failures = []
+        for name, queryset, tables in hot_queries(user, author, recipe):
+            plan = queryset.explain()
+            aliases = {
+                alias: table for table, alias in ALIAS.findall(str(queryset.query))
+            }
+            scanned = tables.intersection(
+                aliases.get(table, table)
+                for table in SEQUENTIAL_SCAN[connection.vendor].findall(plan)
+            )
+            if scanned:
+                failures.append(name)
+                self.stdout.write(
+                    self.style.ERROR(f"{name}: sequential scan on {', '.join(scanned)}")
+                )
+            else:
+                self.stdout.write(f"{name}: ok")
+            if options["plans"] or scanned:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(
+                f"Последовательное чтение в запросах: {', '.join(failures)}"
+            )
+        self.stdout.write(self.style.SUCCESS("All hot queries use indexes."))
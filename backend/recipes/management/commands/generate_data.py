@@ -0,0 +1,230 @@
+import random
+import time
+from io import BytesIO
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from PIL import Image
+
+from foodgram.cache import invalidate_cache
+from foodgram.const import RECIPE_IMAGE_UPLOAD_TO
+from foodgram.images import process_image
+from recipes.counters import reconcile_counters
+from recipes.match_index import recipe_match_index
+from recipes.models import Favorite, Ingredient, Recipe, RecipeIngredient, ShoppingCart
+from recipes.search import update_search_index
+from recipes.shopping_lists import refresh_shopping_lists
+from users.models import User
+
+PASSWORD = "synthetic-password"
+WORDS = (
+    "суп",
+    "салат",
+    "пирог",
+    "каша",
+    "рагу",
+    "запеканка",
+    "блины",
+    "котлеты",
+    "паста",
+    "плов",
+    "омлет",
+    "борщ",
+    "соус",
+    "торт",
+    "жаркое",
+    "оладьи",
+    "домашний",
+    "быстрый",
+    "летний",
+    "острый",
+    "сливочный",
+    "овощной",
+    "куриный",
+    "грибной",
+    "сырный",
+    "ягодный",
+    "пряный",
+    "бабушкин",
+)
+
+
+def popularity(total, skew):
+    return list(accumulate(1 / (rank + 1) ** skew for rank in range(total)))
+
+
+def batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def pick(rng, population, cum_weights, count):
+    if not population or count <= 0:
+        return set()
+    return set(rng.choices(population, cum_weights=cum_weights, k=count))
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users, recipes, favorites, carts and subscriptions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--recipes", type=int, default=10_000)
+        parser.add_argument("--min-ingredients", type=int, default=3)
+        parser.add_argument("--max-ingredients", type=int, default=12)
+        parser.add_argument("--favorites", type=int, default=20)
+        parser.add_argument("--carts", type=int, default=5)
+        parser.add_argument("--subscriptions", type=int, default=10)
+        parser.add_argument("--skew", type=float, default=1.1)
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        ingredients = list(Ingredient.objects.values_list("pk", flat=True))
+        if len(ingredients) < options["max_ingredients"]:
+            raise CommandError("Недостаточно ингредиентов, выполните load_ingredients")
+        if User.objects.filter(username__startswith=options["prefix"]).exists():
+            raise CommandError(
+                f"Пользователи с префиксом {options['prefix']} уже существуют"
+            )
+
+        self.rng = random.Random(options["seed"])
+        self.options = options
+        started = time.perf_counter()
+        image = self.save_image()
+        with transaction.atomic():
+            users = self.step("users", self.create_users)
+            recipes = self.step("recipes", self.create_recipes, users, image)
+            self.step("ingredients", self.create_ingredients, recipes, ingredients)
+            self.step(
+                "favorites", self.create_links, Favorite, users, recipes, "favorites"
+            )
+            self.step("carts", self.create_links, ShoppingCart, users, recipes, "carts")
+            self.step("subscriptions", self.create_subscriptions, users)
+            self.step("search index", update_search_index, recipes)
+            self.step("shopping lists", self.create_shopping_lists, users)
+            self.step("counters", reconcile_counters)
+            invalidate_cache("recipes")
+            transaction.on_commit(recipe_match_index.invalidate)
+        self.stdout.write(
+            self.style.SUCCESS(f"Done in {time.perf_counter() - started:.1f}s")
+        )
+
+    def step(self, label, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        size = f" ({len(result)})" if isinstance(result, list) else ""
+        self.stdout.write(f"{label}{size}: {time.perf_counter() - started:.1f}s")
+        return result
+
+    def save_image(self):
+        name = f"{RECIPE_IMAGE_UPLOAD_TO}{self.options['prefix']}.png"
+        if not default_storage.exists(name):
+            buffer = BytesIO()
+            Image.new("RGB", (1200, 800), (200, 120, 60)).save(buffer, format="PNG")
+            name = default_storage.save(name, ContentFile(buffer.getvalue()))
+        process_image(name)
+        return name
+
+    def create_users(self):
+        password = make_password(PASSWORD)
+        prefix = self.options["prefix"]
+        for numbers in batches(
+            range(self.options["users"]), self.options["batch_size"]
+        ):
+            User.objects.bulk_create(
+                User(
+                    username=f"{prefix}{number}",
+                    email=f"{prefix}{number}@example.com",
+                    first_name=self.rng.choice(WORDS).capitalize(),
+                    last_name=self.rng.choice(WORDS).capitalize(),
+                    password=password,
+                )
+                for number in numbers
+            )
+        return list(
+            User.objects.filter(username__startswith=prefix)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+    def create_recipes(self, users, image):
+        authors = popularity(len(users), self.options["skew"])
+        last = Recipe.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        for numbers in batches(
+            range(self.options["recipes"]), self.options["batch_size"]
+        ):
+            Recipe.objects.bulk_create(
+                Recipe(
+                    author_id=self.rng.choices(users, cum_weights=authors)[0],
+                    name=" ".join(self.rng.sample(WORDS, 3)).capitalize(),
+                    text=" ".join(self.rng.choices(WORDS, k=60)),
+                    cooking_time=self.rng.randint(5, 180),
+                    image=image,
+                    image_variants_ready=True,
+                )
+                for _ in numbers
+            )
+        return list(
+            Recipe.objects.filter(pk__gt=last)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+    def create_ingredients(self, recipes, ingredients):
+        weights = popularity(len(ingredients), self.options["skew"])
+        for batch in batches(recipes, self.options["batch_size"]):
+            rows = []
+            for recipe_id in batch:
+                count = self.rng.randint(
+                    self.options["min_ingredients"], self.options["max_ingredients"]
+                )
+                chosen = pick(self.rng, ingredients, weights, count)
+                rows.extend(
+                    RecipeIngredient(
+                        recipe_id=recipe_id,
+                        ingredient_id=ingredient_id,
+                        amount=self.rng.randint(1, 500),
+                    )
+                    for ingredient_id in chosen
+                )
+            RecipeIngredient.objects.bulk_create(rows)
+        return recipes
+
+    def create_links(self, model, users, recipes, option):
+        weights = popularity(len(recipes), self.options["skew"])
+        shuffled = self.rng.sample(recipes, len(recipes))
+        rows = []
+        for user_id in users:
+            count = self.rng.randint(0, 2 * self.options[option])
+            rows.extend(
+                model(user_id=user_id, recipe_id=recipe_id)
+                for recipe_id in pick(self.rng, shuffled, weights, count)
+            )
+        for batch in batches(rows, self.options["batch_size"]):
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+        return rows
+
+    def create_subscriptions(self, users):
+        Subscription = User.subscriptions.through
+        weights = popularity(len(users), self.options["skew"])
+        rows = []
+        for user_id in users:
+            count = self.rng.randint(0, 2 * self.options["subscriptions"])
+            rows.extend(
+                Subscription(from_user_id=user_id, to_user_id=author_id)
+                for author_id in pick(self.rng, users, weights, count)
+                if author_id != user_id
+            )
+        for batch in batches(rows, self.options["batch_size"]):
+            Subscription.objects.bulk_create(batch, ignore_conflicts=True)
+        return rows
+
+    def create_shopping_lists(self, users):
+        for batch in batches(users, self.options["batch_size"]):
+            refresh_shopping_lists(batch)
@@ -1,33 +1,105 @@
+import csv
 import json
 import os
+import time
+from itertools import islice
 
 from django.core.management.base import BaseCommand
 
+from recipes.ingredient_index import ingredient_index
 from recipes.models import Ingredient
 
+DEFAULT_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../../data/ingredients.json")
+)
+BATCH_SIZE = 1000
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def iter_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started and buffer:
+            if buffer[0] != "[":
+                raise ValueError("Ожидался JSON-массив ингредиентов")
+            buffer = buffer[1:].lstrip()
+            started = True
+        if started and buffer[:1] == ",":
+            buffer = buffer[1:].lstrip()
+        if started and buffer[:1] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof:
+                if buffer:
+                    raise
+                return
+            chunk = file.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        buffer = buffer[end:]
+        yield item
+
+
+def iter_csv(file):
+    for row in csv.reader(file):
+        if len(row) == 2:
+            yield {"name": row[0], "measurement_unit": row[1]}
+
+
+READERS = {
+    ".json": iter_json,
+    ".csv": iter_csv,
+}
+
 
 class Command(BaseCommand):
-    help = "Load ingredients from a JSON file"
+    help = "Load ingredients from a JSON or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=DEFAULT_PATH)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
 
     def handle(self, *args, **options):
-        json_path = os.path.join(
-            os.path.dirname(__file__), "../../../data/ingredients.json"
-        )
-        json_path = os.path.abspath(json_path)
+        path = os.path.abspath(options["path"])
+        batch_size = options["batch_size"]
+        reader = READERS.get(os.path.splitext(path)[1].lower())
+        if reader is None:
+            self.stderr.write(self.style.ERROR(f"Unsupported file type: {path}"))
+            return
 
+        started = time.perf_counter()
         try:
-            with open(json_path, encoding="utf-8") as f:
-                data = json.load(f)
-
-            for item in data:
-                Ingredient.objects.get_or_create(**item)
+            before = Ingredient.objects.count()
+            total = 0
+            with open(path, encoding="utf-8", newline="") as f:
+                items = reader(f)
+                while batch := list(islice(items, batch_size)):
+                    Ingredient.objects.bulk_create(
+                        [Ingredient(**item) for item in batch],
+                        ignore_conflicts=True,
+                    )
+                    total += len(batch)
+            inserted = Ingredient.objects.count() - before
+            if inserted:
+                ingredient_index.invalidate()
 
             self.stdout.write(
-                self.style.SUCCESS(f"Successfully loaded {len(data)} ingredients.")
+                self.style.SUCCESS(
+                    f"Processed {total} ingredients: {inserted} inserted, "
+                    f"{total - inserted} skipped "
+                    f"in {time.perf_counter() - started:.3f}s."
+                )
             )
 
         except FileNotFoundError:
-            self.stderr.write(self.style.ERROR(f"File not found: {json_path}"))
+            self.stderr.write(self.style.ERROR(f"File not found: {path}"))
 
         except Exception as e:
             self.stderr.write(self.style.ERROR(f"Error loading ingredients: {e}"))
@@ -0,0 +1,68 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from foodgram.const import PROFILING_REPORT_LIMIT
+from foodgram.profiling import profile_store
+from users.models import User
+
+DEFAULT_PATHS = (
+    "/api/recipes/",
+    "/api/recipes/?is_favorited=1",
+    "/api/recipes/?is_in_shopping_cart=1",
+    "/api/recipes/shopping_cart/",
+    "/api/recipes/favorite/",
+    "/api/ingredients/",
+    "/api/users/",
+    "/api/users/subscriptions/",
+)
+PROFILING_MIDDLEWARE = "foodgram.profiling.QueryProfilingMiddleware"
+
+
+class Command(BaseCommand):
+    help = "Request endpoints with query profiling enabled and print the top offenders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS)
+        parser.add_argument("--email", help="Authenticate requests as this user")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--top", type=int, default=PROFILING_REPORT_LIMIT)
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        headers = {"HTTP_HOST": settings.ALLOWED_HOSTS[0] or "localhost"}
+        if options["email"]:
+            try:
+                user = User.objects.get(email=options["email"])
+            except User.DoesNotExist:
+                raise CommandError(f"Пользователь {options['email']} не найден")
+            token, _ = Token.objects.get_or_create(user=user)
+            headers["HTTP_AUTHORIZATION"] = f"Token {token.key}"
+
+        middleware = [PROFILING_MIDDLEWARE] + [
+            name for name in settings.MIDDLEWARE if name != PROFILING_MIDDLEWARE
+        ]
+        profile_store.reset()
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client()
+            for path in options["paths"]:
+                for _ in range(options["repeat"]):
+                    client.get(path, **headers)
+
+        report = profile_store.report(options["top"])
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+        for row in report:
+            self.stdout.write(
+                f"{row['view']}: p50={row['p50_ms']}ms p95={row['p95_ms']}ms "
+                f"queries={row['queries_p50']} (max {row['queries_max']}) "
+                f"sql_p95={row['sql_p95_ms']}ms "
+                f"serializer_p95={row['serializer_p95_ms']}ms "
+                f"size_p95={row['size_p95']}B"
+            )
+            for duplicate in row["duplicates"]:
+                self.stdout.write(f"    x{duplicate['count']} {duplicate['sql']}")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recalculate denormalized favorite, cart, recipe and subscriber counters"
+
+    def handle(self, *args, **options):
+        for counter, fixed in reconcile_counters().items():
+            self.stdout.write(f"{counter}: {fixed} rows fixed")
+        self.stdout.write(self.style.SUCCESS("Counters are consistent."))
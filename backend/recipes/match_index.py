@@ -0,0 +1,200 @@
+import threading
+from array import array
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Max
+
+from foodgram.const import RECIPE_MATCH_INDEX_VERSION_KEY, RECIPE_MATCH_LOAD_CHUNK_SIZE
+
+from .index_freshness import IndexFreshness
+from .models import RecipeIngredient
+
+TYPECODE = "q"
+
+
+def to_bitset(recipe_ids, size):
+    buffer = bytearray(size)
+    for recipe_id in recipe_ids:
+        buffer[recipe_id >> 3] |= 1 << (recipe_id & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def count_planes(bitsets):
+    planes = []
+    for carry in bitsets:
+        for position, plane in enumerate(planes):
+            planes[position], carry = plane ^ carry, plane & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+    return planes
+
+
+def with_count(candidates, planes, count):
+    if count >> len(planes):
+        return 0
+    for position, plane in enumerate(planes):
+        candidates &= plane if count >> position & 1 else ~plane
+        if not candidates:
+            break
+    return candidates
+
+
+class RecipeMatchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._postings = None
+        self._sizes = None
+        self._recipes = None
+        self._freshness = IndexFreshness(self._fingerprint)
+
+    def _fingerprint(self):
+        return RecipeIngredient.objects.using(DEFAULT_DB_ALIAS).aggregate(
+            total=Count("pk"), last=Max("pk")
+        )
+
+    def _current_version(self):
+        version = cache.get(RECIPE_MATCH_INDEX_VERSION_KEY)
+        if version is None:
+            cache.add(RECIPE_MATCH_INDEX_VERSION_KEY, 0, None)
+            version = cache.get(RECIPE_MATCH_INDEX_VERSION_KEY)
+        return version
+
+    def _bump_version(self):
+        try:
+            return cache.incr(RECIPE_MATCH_INDEX_VERSION_KEY)
+        except ValueError:
+            cache.add(RECIPE_MATCH_INDEX_VERSION_KEY, 0, None)
+            return cache.incr(RECIPE_MATCH_INDEX_VERSION_KEY)
+
+    def _load(self):
+        version = self._current_version()
+        loaded_at = self._freshness.loaded_at
+        if (
+            self._postings is not None
+            and version == self._version
+            and not self._freshness.stale()
+        ):
+            return
+        with self._lock:
+            if self._postings is not None and self._freshness.loaded_at != loaded_at:
+                return
+            state = self._fingerprint()
+            postings = {}
+            recipes = {}
+            rows = (
+                RecipeIngredient.objects.using(DEFAULT_DB_ALIAS)
+                .order_by("recipe_id", "ingredient_id")
+                .values_list("recipe_id", "ingredient_id")
+                .iterator(chunk_size=RECIPE_MATCH_LOAD_CHUNK_SIZE)
+            )
+            for recipe_id, ingredient_id in rows:
+                postings.setdefault(ingredient_id, array(TYPECODE)).append(recipe_id)
+                recipes.setdefault(recipe_id, array(TYPECODE)).append(ingredient_id)
+            by_size = {}
+            for recipe_id, ingredients in recipes.items():
+                by_size.setdefault(len(ingredients), array(TYPECODE)).append(recipe_id)
+            size = (max(recipes, default=0) >> 3) + 1
+            self._postings = {
+                ingredient_id: to_bitset(recipe_ids, size)
+                for ingredient_id, recipe_ids in postings.items()
+            }
+            self._sizes = {
+                total: to_bitset(recipe_ids, size)
+                for total, recipe_ids in by_size.items()
+            }
+            self._recipes = recipes
+            self._version = version
+            self._freshness.loaded(state)
+
+    def _discard(self, recipe_id):
+        ingredients = self._recipes.pop(recipe_id, ())
+        if not ingredients:
+            return
+        mask = ~(1 << recipe_id)
+        for ingredient_id in ingredients:
+            self._postings[ingredient_id] &= mask
+            if not self._postings[ingredient_id]:
+                del self._postings[ingredient_id]
+        self._sizes[len(ingredients)] &= mask
+        if not self._sizes[len(ingredients)]:
+            del self._sizes[len(ingredients)]
+
+    def _apply(self, change):
+        with self._lock:
+            self._load()
+            expected = self._version
+            change()
+            version = self._bump_version()
+            if version == expected + 1:
+                self._version = version
+            else:
+                self._postings = None
+
+    def set_recipe(self, recipe_id, ingredient_ids):
+        def change():
+            self._discard(recipe_id)
+            ingredients = array(TYPECODE, sorted(set(ingredient_ids)))
+            if not ingredients:
+                return
+            bit = 1 << recipe_id
+            for ingredient_id in ingredients:
+                self._postings[ingredient_id] = (
+                    self._postings.get(ingredient_id, 0) | bit
+                )
+            self._sizes[len(ingredients)] = self._sizes.get(len(ingredients), 0) | bit
+            self._recipes[recipe_id] = ingredients
+
+        self._apply(change)
+
+    def refresh_recipe(self, recipe_id):
+        self.set_recipe(
+            recipe_id,
+            RecipeIngredient.objects.using(DEFAULT_DB_ALIAS)
+            .filter(recipe_id=recipe_id)
+            .values_list("ingredient_id", flat=True),
+        )
+
+    def remove_recipe(self, recipe_id):
+        self._apply(lambda: self._discard(recipe_id))
+
+    def match(self, ingredient_ids, limit):
+        with self._lock:
+            self._load()
+            postings = [
+                self._postings[ingredient_id]
+                for ingredient_id in set(ingredient_ids)
+                if ingredient_id in self._postings
+            ]
+            sizes = dict(self._sizes)
+        planes = count_planes(postings)
+        ranks = sorted(
+            (
+                (matched, total)
+                for total in sizes
+                for matched in range(1, min(total, len(postings)) + 1)
+            ),
+            key=lambda rank: (rank[0] / rank[1], rank[0]),
+            reverse=True,
+        )
+        results = []
+        for matched, total in ranks:
+            candidates = with_count(sizes[total], planes, matched)
+            while candidates and len(results) < limit:
+                recipe_id = candidates.bit_length() - 1
+                results.append((recipe_id, matched, total))
+                candidates ^= 1 << recipe_id
+            if len(results) >= limit:
+                break
+        return results
+
+    def invalidate(self):
+        with self._lock:
+            self._postings = None
+        self._bump_version()
+
+
+recipe_match_index = RecipeMatchIndex()
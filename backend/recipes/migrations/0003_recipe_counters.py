@@ -0,0 +1,59 @@
+# Generated by Django 3.2.3 on 2026-10-18 17:29
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    return Coalesce(
+        models.Subquery(
+            model.objects.filter(**{field: models.OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=models.Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    Favorite = apps.get_model("recipes", "Favorite")
+    ShoppingCart = apps.get_model("recipes", "ShoppingCart")
+    User = apps.get_model("users", "User")
+
+    Recipe.objects.update(
+        favorites_count=count_of(Favorite, "recipe"),
+        in_carts_count=count_of(ShoppingCart, "recipe"),
+    )
+    User.objects.update(
+        recipes_count=count_of(Recipe, "author"),
+        subscribers_count=count_of(User.subscriptions.through, "to_user"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_user_counters"),
+        ("recipes", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="favorites_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Добавлений в избранное"
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="in_carts_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Добавлений в список покупок"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.3 on 2026-10-18 17:40
+
+from django.db import migrations
+
+POSTGRESQL_FORWARD = (
+    "ALTER TABLE recipes_recipe ADD COLUMN search_vector tsvector",
+    "CREATE INDEX recipe_search_vector_idx ON recipes_recipe "
+    "USING GIN (search_vector)",
+    "UPDATE recipes_recipe r SET search_vector = "
+    "setweight(to_tsvector('russian', r.name), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(("
+    "SELECT string_agg(i.name, ' ') FROM recipes_recipeingredient ri "
+    "JOIN recipes_ingredient i ON i.id = ri.ingredient_id "
+    "WHERE ri.recipe_id = r.id), '')), 'B') || "
+    "setweight(to_tsvector('russian', r.text), 'D')",
+)
+POSTGRESQL_BACKWARD = (
+    "DROP INDEX recipe_search_vector_idx",
+    "ALTER TABLE recipes_recipe DROP COLUMN search_vector",
+)
+SQLITE_FORWARD = (
+    "CREATE VIRTUAL TABLE recipes_recipe_fts USING fts5(name, ingredients, text)",
+    "INSERT INTO recipes_recipe_fts (rowid, name, ingredients, text) "
+    "SELECT r.id, r.name, coalesce(("
+    "SELECT group_concat(i.name, ' ') FROM recipes_recipeingredient ri "
+    "JOIN recipes_ingredient i ON i.id = ri.ingredient_id "
+    "WHERE ri.recipe_id = r.id), ''), r.text FROM recipes_recipe r",
+)
+SQLITE_BACKWARD = ("DROP TABLE recipes_recipe_fts",)
+
+
+def run(statements):
+    def execute(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements.get(vendor, ()):
+            schema_editor.execute(statement)
+
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0004_recipe_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"postgresql": POSTGRESQL_FORWARD, "sqlite": SQLITE_FORWARD}),
+            run({"postgresql": POSTGRESQL_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
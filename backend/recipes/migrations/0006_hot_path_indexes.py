@@ -0,0 +1,79 @@
+# Generated by Django 3.2.3 on 2026-10-18 18:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+POSTGRESQL_FORWARD = (
+    "CREATE INDEX ingredient_name_upper_idx ON recipes_ingredient "
+    "(UPPER(name::text) text_pattern_ops)",
+)
+POSTGRESQL_BACKWARD = ("DROP INDEX ingredient_name_upper_idx",)
+SQLITE_FORWARD = (
+    "CREATE INDEX ingredient_name_nocase_idx ON recipes_ingredient "
+    "(name COLLATE NOCASE)",
+)
+SQLITE_BACKWARD = ("DROP INDEX ingredient_name_nocase_idx",)
+
+
+def run(statements):
+    def execute(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements.get(vendor, ()):
+            schema_editor.execute(statement)
+
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("recipes", "0005_recipe_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["author", "-created", "-id"], name="recipe_author_created_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="author",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="recipes",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Автор",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="favorite",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="favorites",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="shoppingcart",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="shopping_cart",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.RunPython(
+            run({"postgresql": POSTGRESQL_FORWARD, "sqlite": SQLITE_FORWARD}),
+            run({"postgresql": POSTGRESQL_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:08
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+from foodgram.images import variant_names
+
+
+def fill_image_variants_ready(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    ready = [
+        name
+        for name in Recipe.objects.values_list("image", flat=True).distinct()
+        if name
+        and all(default_storage.exists(path) for path in variant_names(name).values())
+    ]
+    Recipe.objects.filter(image__in=ready).update(image_variants_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0007_shopping_list_item"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="image_variants_ready",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="Варианты картинки готовы"
+            ),
+        ),
+        migrations.RunPython(fill_image_variants_ready, migrations.RunPython.noop),
+    ]
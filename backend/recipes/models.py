@@ -10,6 +10,7 @@ from foodgram.const import (
     RECIPE_MIN_COOKING_TIME,
     RECIPE_NAME_MAX_LENGTH,
 )
+from foodgram.models import CounterFieldsMixin
 
 User = get_user_model()
 
@@ -45,9 +46,53 @@ class Ingredient(models.Model):
         return self.name
 
 
-class Recipe(TimeStampedModel):
+class RecipeQuerySet(models.QuerySet):
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=models.Value(False, output_field=models.BooleanField()),
+                is_in_shopping_cart=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+            )
+        return self.annotate(
+            is_favorited=models.Exists(
+                Favorite.objects.filter(user=user, recipe=models.OuterRef("pk"))
+            ),
+            is_in_shopping_cart=models.Exists(
+                ShoppingCart.objects.filter(user=user, recipe=models.OuterRef("pk"))
+            ),
+        )
+
+    def limit_per_author(self, limit):
+        if limit <= 0:
+            return self.none()
+        latest = (
+            Recipe.objects.filter(author=models.OuterRef("author"))
+            .order_by("-created", "-id")
+            .values("pk")[:limit]
+        )
+        return self.filter(pk__in=models.Subquery(latest))
+
+    def for_user(self, user):
+        return self.with_user_flags(user).prefetch_related(
+            models.Prefetch(
+                "author", queryset=User.objects.with_subscription_flag(user)
+            ),
+            models.Prefetch(
+                "recipe_ingredients",
+                queryset=RecipeIngredient.objects.select_related("ingredient"),
+            ),
+        )
+
+
+class Recipe(CounterFieldsMixin, TimeStampedModel):
     author = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="recipes", verbose_name="Автор"
+        User,
+        on_delete=models.CASCADE,
+        related_name="recipes",
+        verbose_name="Автор",
+        db_index=False,
     )
     name = models.CharField(max_length=RECIPE_NAME_MAX_LENGTH, verbose_name="Название")
     image = models.ImageField(upload_to=RECIPE_IMAGE_UPLOAD_TO, verbose_name="Картинка")
@@ -67,11 +112,30 @@ class Recipe(TimeStampedModel):
         related_name="recipes",
         verbose_name="Ингредиенты",
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Добавлений в избранное"
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Добавлений в список покупок"
+    )
+    image_variants_ready = models.BooleanField(
+        default=False, editable=False, verbose_name="Варианты картинки готовы"
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
+    counter_fields = ("favorites_count", "in_carts_count", "image_variants_ready")
 
     class Meta:
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
         ordering = ("-created",)
+        indexes = [
+            models.Index(fields=("-created", "-id"), name="recipe_created_id_idx"),
+            models.Index(
+                fields=("author", "-created", "-id"), name="recipe_author_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -115,6 +179,7 @@ class Favorite(models.Model):
         on_delete=models.CASCADE,
         related_name="favorites",
         verbose_name="Пользователь",
+        db_index=False,
     )
     recipe = models.ForeignKey(
         Recipe,
@@ -141,6 +206,7 @@ class ShoppingCart(models.Model):
         on_delete=models.CASCADE,
         related_name="shopping_cart",
         verbose_name="Пользователь",
+        db_index=False,
     )
     recipe = models.ForeignKey(
         Recipe,
@@ -160,3 +226,32 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f"{self.user.username} добавил {self.recipe.name} " f"в список покупок"
+
+
+class ShoppingListItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="shopping_list_items",
+        verbose_name="Пользователь",
+        db_index=False,
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name="shopping_list_items",
+        verbose_name="Ингредиент",
+    )
+    amount = models.PositiveIntegerField(verbose_name="Количество")
+
+    class Meta:
+        verbose_name = "Позиция списка покупок"
+        verbose_name_plural = "Позиции списков покупок"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "ingredient"], name="unique_shopping_list_item"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.ingredient.name} для {self.user.username} – {self.amount}"
@@ -0,0 +1,100 @@
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "russian"
+SQLITE_TABLE = "recipes_recipe_fts"
+
+INGREDIENT_NAMES_SQL = {
+    "postgresql": (
+        "SELECT string_agg(i.name, ' ') FROM recipes_recipeingredient ri "
+        "JOIN recipes_ingredient i ON i.id = ri.ingredient_id "
+        "WHERE ri.recipe_id = r.id"
+    ),
+    "sqlite": (
+        "SELECT group_concat(i.name, ' ') FROM recipes_recipeingredient ri "
+        "JOIN recipes_ingredient i ON i.id = ri.ingredient_id "
+        "WHERE ri.recipe_id = r.id"
+    ),
+}
+
+
+def update_search_index(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids or connection.vendor not in INGREDIENT_NAMES_SQL:
+        return
+    placeholders = ", ".join(["%s"] * len(recipe_ids))
+    ingredients = INGREDIENT_NAMES_SQL[connection.vendor]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "UPDATE recipes_recipe r SET search_vector = "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', r.name), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+                f"coalesce(({ingredients}), '')), 'B') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', r.text), 'D') "
+                f"WHERE r.id IN ({placeholders})",
+                recipe_ids,
+            )
+            return
+        cursor.execute(
+            f"DELETE FROM {SQLITE_TABLE} WHERE rowid IN ({placeholders})",
+            recipe_ids,
+        )
+        cursor.execute(
+            f"INSERT INTO {SQLITE_TABLE} (rowid, name, ingredients, text) "
+            f"SELECT r.id, r.name, coalesce(({ingredients}), ''), r.text "
+            f"FROM recipes_recipe r WHERE r.id IN ({placeholders})",
+            recipe_ids,
+        )
+
+
+def remove_from_search_index(recipe_id):
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [recipe_id])
+
+
+def sqlite_match_query(value):
+    terms = value.replace('"', " ").split()
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_recipes(queryset, value):
+    if connection.vendor == "postgresql":
+        query = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return (
+            queryset.filter(
+                pk__in=RawSQL(
+                    f"SELECT id FROM recipes_recipe WHERE search_vector @@ {query}",
+                    (value,),
+                )
+            )
+            .annotate(
+                rank=RawSQL(
+                    f"ts_rank(recipes_recipe.search_vector, {query})",
+                    (value,),
+                    FloatField(),
+                )
+            )
+            .order_by("-rank", "-created")
+        )
+    if connection.vendor == "sqlite":
+        match = sqlite_match_query(value)
+        if not match:
+            return queryset.none()
+        return (
+            queryset.extra(
+                tables=[SQLITE_TABLE],
+                where=[
+                    f"{SQLITE_TABLE}.rowid = recipes_recipe.id",
+                    f"{SQLITE_TABLE} MATCH %s",
+                ],
+                params=[match],
+            )
+            .annotate(
+                rank=RawSQL(f"-bm25({SQLITE_TABLE}, 10.0, 5.0, 1.0)", (), FloatField())
+            )
+            .order_by("-rank", "-created")
+        )
+    return queryset.filter(name__icontains=value)
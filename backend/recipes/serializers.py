@@ -1,10 +1,20 @@
 from django.db import transaction
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
+from api.fields import Base64ImageField, ImageVariantsField
+from foodgram.const import RECIPE_BULK_MAX_SIZE
 from users.serializers import UserSerializer
 
-from .models import Ingredient, Recipe, RecipeIngredient
+from .ingredient_index import ingredient_index
+from .match_index import recipe_match_index
+from .models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingListItem,
+)
+from .search import update_search_index
+from .shopping_lists import change_recipe_amounts
 
 
 class IngredientInRecipeSerializer(serializers.ModelSerializer):
@@ -18,6 +28,11 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "measurement_unit", "amount")
 
 
+class ShoppingListItemSerializer(IngredientInRecipeSerializer):
+    class Meta(IngredientInRecipeSerializer.Meta):
+        model = ShoppingListItem
+
+
 class IngredientSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField()
     name = serializers.CharField()
@@ -29,9 +44,24 @@ class IngredientSerializer(serializers.ModelSerializer):
 
 
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField(source="image", ready="image_variants_ready")
+
     class Meta:
         model = Recipe
-        fields = ("id", "name", "image", "cooking_time")
+        fields = ("id", "name", "image", "image_variants", "cooking_time")
+
+
+class RecipeMatchSerializer(RecipeMinifiedSerializer):
+    matched_ingredients = serializers.ReadOnlyField()
+    total_ingredients = serializers.ReadOnlyField()
+    coverage = serializers.ReadOnlyField()
+
+    class Meta(RecipeMinifiedSerializer.Meta):
+        fields = RecipeMinifiedSerializer.Meta.fields + (
+            "matched_ingredients",
+            "total_ingredients",
+            "coverage",
+        )
 
 
 class RecipeSerializer(serializers.ModelSerializer):
@@ -41,6 +71,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField(source="image", ready="image_variants_ready")
 
     class Meta:
         model = Recipe
@@ -52,11 +83,14 @@ class RecipeSerializer(serializers.ModelSerializer):
             "is_in_shopping_cart",
             "name",
             "image",
+            "image_variants",
             "text",
             "cooking_time",
         )
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
         request = self.context.get("request")
         return (
             request
@@ -65,6 +99,8 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
         request = self.context.get("request")
         return (
             request
@@ -81,14 +117,6 @@ class CreateShortIngredientsSerializer(serializers.ModelSerializer):
         model = Ingredient
         fields = ("id", "amount")
 
-    def validate_id(self, id):
-        try:
-            Ingredient.objects.get(id=id)
-        except Ingredient.DoesNotExist:
-            raise serializers.ValidationError(f"Ингредиента с id {id} не существует.")
-
-        return id
-
     def validate_amount(self, value):
         if value < 1:
             raise serializers.ValidationError(
@@ -112,9 +140,9 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         )
 
     def to_representation(self, instance):
-        serializer = RecipeSerializer(
-            instance, context={"request": self.context.get("request")}
-        )
+        request = self.context.get("request")
+        instance = Recipe.objects.for_user(request.user).get(pk=instance.pk)
+        serializer = RecipeSerializer(instance, context={"request": request})
         return serializer.data
 
     def validate(self, data):
@@ -122,19 +150,40 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         cooking_time = data.get("cooking_time")
         image = data.get("image")
 
-        if image is None:
+        if image is None and not self.partial:
             raise serializers.ValidationError(
                 {"image": "Изображение является обязательным полем."}
             )
 
-        if not ingredients:
-            raise serializers.ValidationError(
-                "Список ингредиентов не может быть пустым!"
-            )
-
-        ingredients_ids = [ingredient["id"] for ingredient in ingredients]
-        if len(ingredients_ids) != len(set(ingredients_ids)):
-            raise serializers.ValidationError("Ингредиенты должны быть уникальными!")
+        if ingredients is not None or not self.partial:
+            if not ingredients:
+                raise serializers.ValidationError(
+                    "Список ингредиентов не может быть пустым!"
+                )
+
+            ingredients_ids = [ingredient["id"] for ingredient in ingredients]
+            if len(ingredients_ids) != len(set(ingredients_ids)):
+                raise serializers.ValidationError(
+                    "Ингредиенты должны быть уникальными!"
+                )
+
+            missing = ingredient_index.missing(ingredients_ids)
+            if missing:
+                missing = sorted(
+                    set(missing).difference(
+                        Ingredient.objects.filter(pk__in=missing).values_list(
+                            "pk", flat=True
+                        )
+                    )
+                )
+            if missing:
+                raise serializers.ValidationError(
+                    {
+                        "ingredients": "Ингредиентов с id {} не существует.".format(
+                            ", ".join(map(str, missing))
+                        )
+                    }
+                )
 
         if cooking_time is not None and cooking_time < 1:
             raise serializers.ValidationError(
@@ -150,17 +199,54 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         user = self.context.get("request").user
         recipe = Recipe.objects.create(**validated_data, author=user)
         self.create_ingredients(ingredients, recipe)
+        update_search_index([recipe.pk])
 
         return recipe
 
     @transaction.atomic
     def update(self, instance, validated_data):
-        RecipeIngredient.objects.filter(recipe=instance).delete()
-
-        self.create_ingredients(validated_data.pop("ingredients"), instance)
+        ingredients = validated_data.pop("ingredients", None)
+        if ingredients is not None:
+            self.update_ingredients(ingredients, instance)
 
         return super().update(instance, validated_data)
 
+    def update_ingredients(self, ingredients, recipe):
+        amounts = {element["id"]: element["amount"] for element in ingredients}
+        existing = {row.ingredient_id: row for row in recipe.recipe_ingredients.all()}
+
+        stale = [
+            row.pk
+            for ingredient_id, row in existing.items()
+            if ingredient_id not in amounts
+        ]
+        changed = []
+        deltas = {}
+        for ingredient_id, row in existing.items():
+            if ingredient_id in amounts and row.amount != amounts[ingredient_id]:
+                deltas[ingredient_id] = amounts[ingredient_id] - row.amount
+                row.amount = amounts[ingredient_id]
+                changed.append(row)
+        added = [
+            RecipeIngredient(recipe=recipe, ingredient_id=ingredient_id, amount=amount)
+            for ingredient_id, amount in amounts.items()
+            if ingredient_id not in existing
+        ]
+
+        if stale:
+            RecipeIngredient.objects.filter(pk__in=stale).delete()
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ["amount"])
+        if added:
+            RecipeIngredient.objects.bulk_create(added)
+        deltas.update((row.ingredient_id, row.amount) for row in added)
+        change_recipe_amounts(recipe.pk, deltas)
+        if stale or added:
+            ingredient_ids = list(amounts)
+            transaction.on_commit(
+                lambda: recipe_match_index.set_recipe(recipe.pk, ingredient_ids)
+            )
+
     def create_ingredients(self, ingredients, recipe):
         instances = [
             RecipeIngredient(
@@ -169,3 +255,15 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             for element in ingredients
         ]
         RecipeIngredient.objects.bulk_create(instances)
+        ingredient_ids = [element["id"] for element in ingredients]
+        transaction.on_commit(
+            lambda: recipe_match_index.set_recipe(recipe.pk, ingredient_ids)
+        )
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=RECIPE_BULK_MAX_SIZE,
+    )
@@ -0,0 +1,154 @@
+from django.db import connection, transaction
+from django.db.models import (
+    Case,
+    F,
+    OuterRef,
+    PositiveIntegerField,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest
+
+from foodgram.const import SHOPPING_LIST_CHUNK_SIZE
+from foodgram.links import link_columns
+
+from .models import Recipe, RecipeIngredient, ShoppingCart, ShoppingListItem
+
+
+def cart_totals(users=None, ingredients=None):
+    totals = RecipeIngredient.objects.all()
+    if users is None:
+        totals = totals.filter(recipe__shopping_cart__isnull=False)
+    else:
+        totals = totals.filter(recipe__shopping_cart__user__in=users)
+    if ingredients is not None:
+        totals = totals.filter(ingredient__in=ingredients)
+    return (
+        totals.values_list("recipe__shopping_cart__user", "ingredient")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+
+
+def add_amounts(select, params, replace=False):
+    table, columns, _ = link_columns(
+        ShoppingListItem, ["user_id", "ingredient_id", "amount"]
+    )
+    user, ingredient, amount = columns
+    total = f"excluded.{amount}" if replace else f"{table}.{amount} + excluded.{amount}"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({user}, {ingredient}, {amount}) {select} "
+            f"ON CONFLICT ({user}, {ingredient}) "
+            f"DO UPDATE SET {amount} = {total}",
+            params,
+        )
+
+
+def subtract_amounts(items, amounts):
+    items.update(
+        amount=Greatest(
+            F("amount") - amounts, Value(0), output_field=PositiveIntegerField()
+        )
+    )
+    items.filter(amount=0).delete()
+
+
+def add_recipes(user_id, recipe_ids):
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+    table, (recipe, ingredient, amount), _ = link_columns(
+        RecipeIngredient, ["recipe_id", "ingredient_id", "amount"]
+    )
+    add_amounts(
+        f"SELECT %s, {ingredient}, SUM({amount}) FROM {table} "
+        f"WHERE {recipe} IN ({', '.join(['%s'] * len(recipe_ids))}) "
+        f"GROUP BY {ingredient}",
+        [user_id, *recipe_ids],
+    )
+
+
+def remove_recipes(user_id, recipe_ids):
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+    rows = RecipeIngredient.objects.filter(recipe__in=recipe_ids)
+    subtract_amounts(
+        ShoppingListItem.objects.filter(
+            user_id=user_id, ingredient__in=rows.values("ingredient")
+        ),
+        Subquery(
+            rows.filter(ingredient=OuterRef("ingredient"))
+            .order_by()
+            .values("ingredient")
+            .annotate(total=Sum("amount"))
+            .values("total")
+        ),
+    )
+
+
+def change_recipe_amounts(recipe_id, deltas):
+    increases = {key: delta for key, delta in deltas.items() if delta > 0}
+    decreases = {key: -delta for key, delta in deltas.items() if delta < 0}
+    if not increases and not decreases:
+        return
+    with transaction.atomic(savepoint=False):
+        list(Recipe.objects.select_for_update().filter(pk=recipe_id).values("pk"))
+        if increases:
+            table, (user, recipe), _ = link_columns(
+                ShoppingCart, ["user_id", "recipe_id"]
+            )
+            rows = " UNION ALL ".join(
+                ["SELECT %s AS id, %s AS amount"] * len(increases)
+            )
+            add_amounts(
+                f"SELECT cart.{user}, delta.id, delta.amount "
+                f"FROM {table} cart, ({rows}) delta WHERE cart.{recipe} = %s",
+                [value for row in increases.items() for value in row] + [recipe_id],
+            )
+        if decreases:
+            subtract_amounts(
+                ShoppingListItem.objects.filter(
+                    user__in=ShoppingCart.objects.filter(recipe_id=recipe_id).values(
+                        "user"
+                    ),
+                    ingredient__in=decreases,
+                ),
+                Case(
+                    *[
+                        When(ingredient_id=key, then=Value(delta))
+                        for key, delta in decreases.items()
+                    ],
+                    output_field=PositiveIntegerField(),
+                ),
+            )
+
+
+def refresh_shopping_lists(users, ingredients=None):
+    items = ShoppingListItem.objects.filter(user__in=users)
+    if ingredients is not None:
+        items = items.filter(ingredient__in=ingredients)
+    with transaction.atomic(savepoint=False):
+        items.delete()
+        add_amounts(
+            *cart_totals(users, ingredients).query.sql_with_params(), replace=True
+        )
+
+
+def shopping_list_drift():
+    expected = {
+        (user_id, ingredient_id): total
+        for user_id, ingredient_id, total in cart_totals().iterator(
+            chunk_size=SHOPPING_LIST_CHUNK_SIZE
+        )
+    }
+    actual = {
+        (user_id, ingredient_id): amount
+        for user_id, ingredient_id, amount in ShoppingListItem.objects.values_list(
+            "user", "ingredient", "amount"
+        ).iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+    }
+    return sorted({user_id for (user_id, _), _ in expected.items() ^ actual.items()})
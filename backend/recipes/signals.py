@@ -0,0 +1,157 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from foodgram.cache import invalidate_cache
+from foodgram.images import image_processed, schedule_image_processing
+
+from .counters import change_counter
+from .ingredient_index import ingredient_index
+from .links import change_recipe_links
+from .match_index import recipe_match_index
+from .models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    User,
+)
+from .search import remove_from_search_index, update_search_index
+from .shopping_lists import change_recipe_amounts
+
+AUTHOR_PUBLIC_FIELDS = {"username", "email", "first_name", "last_name", "avatar"}
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(**kwargs):
+    ingredient_index.invalidate()
+    invalidate_cache("ingredients")
+    invalidate_cache("recipes")
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def invalidate_recipe_responses(**kwargs):
+    invalidate_cache("recipes")
+
+
+@receiver(post_save, sender=User)
+def author_changed(instance, update_fields, **kwargs):
+    if update_fields is None or AUTHOR_PUBLIC_FIELDS.intersection(update_fields):
+        Recipe.objects.filter(author=instance).update(updated=timezone.now())
+        invalidate_cache("recipes")
+
+
+@receiver(image_processed)
+def recipe_images_processed(name, **kwargs):
+    Recipe.objects.filter(image=name).update(image_variants_ready=True)
+    Recipe.objects.filter(Q(image=name) | Q(author__avatar=name)).update(
+        updated=timezone.now()
+    )
+    invalidate_cache("recipes")
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_search_index_saved(instance, **kwargs):
+    update_search_index([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_search_index_deleted(instance, **kwargs):
+    remove_from_search_index(instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_match_index_deleted(instance, **kwargs):
+    recipe_id = instance.pk
+    transaction.on_commit(lambda: recipe_match_index.remove_recipe(recipe_id))
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def recipe_match_index_ingredients_changed(instance, **kwargs):
+    recipe_ids = {instance.recipe_id}
+    previous = getattr(instance, "previous", None)
+    if previous is not None:
+        recipe_ids.add(previous["recipe_id"])
+    for recipe_id in recipe_ids:
+        transaction.on_commit(
+            lambda recipe_id=recipe_id: recipe_match_index.refresh_recipe(recipe_id)
+        )
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_match_index_deleted(**kwargs):
+    transaction.on_commit(recipe_match_index.invalidate)
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_search_index_saved(instance, created, **kwargs):
+    if not created:
+        update_search_index(
+            RecipeIngredient.objects.filter(ingredient=instance).values_list(
+                "recipe_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, "recipes_count", 1)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(instance, created, update_fields, **kwargs):
+    if update_fields is None or "image" in update_fields:
+        if not created:
+            Recipe.objects.filter(pk=instance.pk).update(image_variants_ready=False)
+        schedule_image_processing(instance.image)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(instance, **kwargs):
+    change_counter(User, instance.author_id, "recipes_count", -1)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def recipe_link_created(sender, instance, created, **kwargs):
+    if created:
+        change_recipe_links(sender, instance.user_id, [instance.recipe_id], 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def recipe_link_deleted(sender, instance, **kwargs):
+    change_recipe_links(sender, instance.user_id, [instance.recipe_id], -1)
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def recipe_ingredient_saving(instance, **kwargs):
+    instance.previous = (
+        RecipeIngredient.objects.filter(pk=instance.pk)
+        .values("recipe_id", "ingredient_id", "amount")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def shopping_list_ingredient_saved(instance, **kwargs):
+    previous = getattr(instance, "previous", None)
+    if previous is not None:
+        change_recipe_amounts(
+            previous["recipe_id"], {previous["ingredient_id"]: -previous["amount"]}
+        )
+    change_recipe_amounts(instance.recipe_id, {instance.ingredient_id: instance.amount})
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def shopping_list_ingredient_deleted(instance, **kwargs):
+    change_recipe_amounts(
+        instance.recipe_id, {instance.ingredient_id: -instance.amount}
+    )
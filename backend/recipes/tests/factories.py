@@ -0,0 +1,61 @@
+import base64
+from io import BytesIO
+
+from PIL import Image
+from rest_framework.test import APIClient
+
+from recipes.counters import reconcile_counters
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from users.models import User
+
+
+def create_user(username):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="Foodgram-12345",
+        first_name=username,
+        last_name=username,
+    )
+
+
+def create_ingredients(count):
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f"ingredient {number}", measurement_unit="г")
+        for number in range(count)
+    )
+    return list(Ingredient.objects.order_by("-pk")[:count])[::-1]
+
+
+def create_recipes(authors, count, ingredients=()):
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=authors[number % len(authors)],
+            name=f"recipe {number}",
+            text="text",
+            cooking_time=number + 1,
+            image="recipes/images/recipe.png",
+        )
+        for number in range(count)
+    )
+    recipes = list(Recipe.objects.order_by("-pk")[:count])[::-1]
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=number + 1)
+        for recipe in recipes
+        for number, ingredient in enumerate(ingredients)
+    )
+    reconcile_counters()
+    return recipes
+
+
+def client_for(user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+def image_payload():
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
@@ -0,0 +1,34 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class HotQueryIndexesTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("load_ingredients", stdout=StringIO())
+        call_command(
+            "generate_data",
+            users=50,
+            recipes=500,
+            favorites=5,
+            carts=2,
+            subscriptions=3,
+            stdout=StringIO(),
+        )
+
+    def test_hot_queries_do_not_scan_tables(self):
+        output = StringIO()
+        call_command("explain_queries", stdout=output)
+        self.assertIn("All hot queries use indexes.", output.getvalue())
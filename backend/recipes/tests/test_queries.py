@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favorite, ShoppingCart
+
+from .factories import (
+    client_for,
+    create_ingredients,
+    create_recipes,
+    create_user,
+)
+
+PAGE_SIZES = (1, 5, 10, 30)
+
+
+class RecipeListQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = create_user("viewer")
+        cls.authors = [create_user(f"author{number}") for number in range(5)]
+        cls.viewer.subscriptions.add(cls.authors[0])
+        cls.recipes = create_recipes(cls.authors, 30, create_ingredients(3))
+        Favorite.objects.create(user=cls.viewer, recipe=cls.recipes[0])
+        ShoppingCart.objects.create(user=cls.viewer, recipe=cls.recipes[1])
+
+    def list_queries(self, client, page_size):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get("/api/recipes/", {"limit": page_size})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), page_size)
+        return len(context.captured_queries), response.json()["results"]
+
+    def test_authenticated_list_queries_do_not_grow_with_page_size(self):
+        client = client_for(self.viewer)
+        counts = {self.list_queries(client, size)[0] for size in PAGE_SIZES}
+        self.assertEqual(len(counts), 1, counts)
+
+    def test_anonymous_list_queries_do_not_grow_with_page_size(self):
+        client = client_for()
+        counts = {self.list_queries(client, size)[0] for size in PAGE_SIZES}
+        self.assertEqual(len(counts), 1, counts)
+
+    def test_list_annotations(self):
+        _, results = self.list_queries(client_for(self.viewer), 30)
+        recipes = {recipe["id"]: recipe for recipe in results}
+        self.assertTrue(recipes[self.recipes[0].pk]["is_favorited"])
+        self.assertFalse(recipes[self.recipes[0].pk]["is_in_shopping_cart"])
+        self.assertTrue(recipes[self.recipes[1].pk]["is_in_shopping_cart"])
+        for recipe in results:
+            self.assertEqual(len(recipe["ingredients"]), 3)
+            self.assertEqual(
+                recipe["author"]["is_subscribed"],
+                recipe["author"]["id"] == self.authors[0].pk,
+            )
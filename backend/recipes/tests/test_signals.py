@@ -0,0 +1,101 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from foodgram.images import image_processed
+from recipes.models import Recipe
+from users.models import User
+
+from .factories import client_for, create_recipes, create_user
+
+
+class AuthorChangedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        create_recipes([cls.author], 2)
+
+    def recipe_updates(self):
+        return list(Recipe.objects.order_by("pk").values_list("updated", flat=True))
+
+    @mock.patch("recipes.signals.invalidate_cache")
+    def test_private_changes_keep_recipes(self, invalidate_cache):
+        updated = self.recipe_updates()
+        author = User.objects.get(pk=self.author.pk)
+        author.set_password("Another-12345")
+        author.save()
+        author.is_staff = True
+        author.save()
+        self.assertEqual(self.recipe_updates(), updated)
+        invalidate_cache.assert_not_called()
+
+    @mock.patch("recipes.signals.invalidate_cache")
+    def test_public_changes_touch_recipes(self, invalidate_cache):
+        updated = self.recipe_updates()
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name = "renamed"
+        author.save()
+        self.assertTrue(
+            all(new > old for new, old in zip(self.recipe_updates(), updated))
+        )
+        invalidate_cache.assert_called_with("recipes")
+
+
+class ImageSavedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        create_recipes([cls.author], 1)
+
+    @mock.patch("recipes.signals.schedule_image_processing")
+    def test_unchanged_image_is_not_reprocessed(self, schedule):
+        recipe = Recipe.objects.get()
+        recipe.name = "renamed"
+        recipe.save()
+        schedule.assert_not_called()
+        recipe.image = "recipes/images/other.png"
+        recipe.save()
+        schedule.assert_called_once_with(recipe.image)
+
+    @mock.patch("users.signals.schedule_image_processing")
+    def test_unchanged_avatar_is_not_reprocessed(self, schedule):
+        author = User.objects.get(pk=self.author.pk)
+        author.last_name = "renamed"
+        author.save()
+        schedule.assert_not_called()
+
+
+class ImageVariantsReadyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        create_recipes([cls.author], 2)
+
+    def test_processed_image_marks_recipes_ready(self):
+        recipe = Recipe.objects.first()
+        image_processed.send(sender=None, name=recipe.image.name)
+        self.assertEqual(Recipe.objects.filter(image_variants_ready=True).count(), 2)
+        with mock.patch("recipes.signals.schedule_image_processing"):
+            recipe.image = "recipes/images/other.png"
+            recipe.save()
+        recipe.refresh_from_db()
+        self.assertFalse(recipe.image_variants_ready)
+
+    def test_processed_avatar_marks_user_ready(self):
+        User.objects.filter(pk=self.author.pk).update(avatar="users/author.png")
+        image_processed.send(sender=None, name="users/author.png")
+        author = User.objects.get(pk=self.author.pk)
+        self.assertTrue(author.avatar_variants_ready)
+        with mock.patch("users.signals.schedule_image_processing"):
+            author.avatar = "users/other.png"
+            author.save()
+        author.refresh_from_db()
+        self.assertFalse(author.avatar_variants_ready)
+
+    @mock.patch("api.fields.default_storage.exists")
+    def test_listing_does_not_probe_storage(self, exists):
+        Recipe.objects.update(image_variants_ready=True)
+        response = client_for(create_user("reader")).get("/api/recipes/")
+        exists.assert_not_called()
+        variants = [recipe["image_variants"] for recipe in response.json()["results"]]
+        self.assertTrue(all(all(variant.values()) for variant in variants))
@@ -0,0 +1,171 @@
+import threading
+from collections import Counter
+from unittest import mock
+
+from django.db import DatabaseError, connections
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+
+from recipes.models import Favorite, Recipe, RecipeIngredient, ShoppingCart
+from users.models import User
+
+from .factories import client_for, create_ingredients, create_recipes, create_user
+
+THREADS = 8
+
+
+class ConcurrentTogglesTest(TransactionTestCase):
+    def setUp(self):
+        self.user = create_user("user")
+        self.author = create_user("author")
+        self.recipe = create_recipes([self.author], 1, create_ingredients(2))[0]
+
+    def hammer(self, method, url):
+        barrier = threading.Barrier(THREADS)
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def toggle():
+            client = client_for(self.user)
+            try:
+                barrier.wait()
+                status = getattr(client, method)(url).status_code
+                with lock:
+                    statuses[status] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=toggle) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+
+    def assert_toggled(self, method, url, status, model, counted, field, expected):
+        self.assertEqual(
+            self.hammer(method, url), Counter({status: 1, 400: THREADS - 1})
+        )
+        self.assertEqual(model.objects.count(), expected)
+        counted.refresh_from_db(fields=[field])
+        self.assertEqual(getattr(counted, field), expected)
+
+    def test_favorite(self):
+        url = f"/api/recipes/{self.recipe.pk}/favorite/"
+        self.assert_toggled(
+            "post", url, 201, Favorite, self.recipe, "favorites_count", 1
+        )
+        self.assert_toggled(
+            "delete", url, 204, Favorite, self.recipe, "favorites_count", 0
+        )
+
+    def test_shopping_cart(self):
+        url = f"/api/recipes/{self.recipe.pk}/shopping_cart/"
+        self.assert_toggled(
+            "post", url, 201, ShoppingCart, self.recipe, "in_carts_count", 1
+        )
+        self.assertEqual(
+            sorted(self.user.shopping_list_items.values_list("ingredient", "amount")),
+            sorted(self.recipe.recipe_ingredients.values_list("ingredient", "amount")),
+        )
+        self.assert_toggled(
+            "delete", url, 204, ShoppingCart, self.recipe, "in_carts_count", 0
+        )
+        self.assertFalse(self.user.shopping_list_items.exists())
+
+    def test_subscribe(self):
+        url = f"/api/users/{self.author.pk}/subscribe/"
+        model = User.subscriptions.through
+        self.assert_toggled(
+            "post", url, 201, model, self.author, "subscribers_count", 1
+        )
+        self.assert_toggled(
+            "delete", url, 204, model, self.author, "subscribers_count", 0
+        )
+
+
+class AtomicTogglesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("user")
+        cls.author = create_user("author")
+        cls.recipe = create_recipes([cls.author], 1, create_ingredients(2))[0]
+
+    def setUp(self):
+        self.client = client_for(self.user)
+        self.client.raise_request_exception = False
+
+    def assert_rolled_back(self, url, model, **link):
+        self.assertEqual(self.client.post(url).status_code, 500)
+        self.assertFalse(model.objects.filter(**link).exists())
+        model.objects.create(**link)
+        self.assertEqual(self.client.delete(url).status_code, 500)
+        self.assertTrue(model.objects.filter(**link).exists())
+
+    @mock.patch("recipes.views.change_recipe_links", side_effect=DatabaseError)
+    def test_recipe_links(self, change_recipe_links):
+        for path, model in (("favorite", Favorite), ("shopping_cart", ShoppingCart)):
+            with self.subTest(path=path):
+                self.assert_rolled_back(
+                    f"/api/recipes/{self.recipe.pk}/{path}/",
+                    model,
+                    user=self.user,
+                    recipe=self.recipe,
+                )
+
+    @mock.patch("api.views.change_subscriptions", side_effect=DatabaseError)
+    def test_subscription(self, change_subscriptions):
+        self.assert_rolled_back(
+            f"/api/users/{self.author.pk}/subscribe/",
+            User.subscriptions.through,
+            from_user=self.user,
+            to_user=self.author,
+        )
+
+
+class BulkTogglesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("user")
+        cls.author = create_user("author")
+        cls.recipes = create_recipes([cls.author], 2, create_ingredients(2))
+
+    def test_bulk_matches_single_toggles(self):
+        client = client_for(self.user)
+        ids = [recipe.pk for recipe in self.recipes]
+        client.post(f"/api/recipes/{ids[0]}/shopping_cart/")
+        response = client.post(
+            "/api/recipes/shopping_cart/bulk/", {"recipes": ids}, format="json"
+        )
+        self.assertEqual(
+            [row["status"] for row in response.data["results"]], ["exists", "added"]
+        )
+        self.assertEqual(
+            list(
+                Recipe.objects.filter(pk__in=ids).values_list(
+                    "in_carts_count", flat=True
+                )
+            ),
+            [1, 1],
+        )
+        self.assertEqual(
+            dict(self.user.shopping_list_items.values_list("ingredient", "amount")),
+            {
+                ingredient: total
+                for ingredient, total in RecipeIngredient.objects.values("ingredient")
+                .annotate(total=Sum("amount"))
+                .values_list("ingredient", "total")
+            },
+        )
+        client.delete(
+            "/api/recipes/shopping_cart/bulk/", {"recipes": ids}, format="json"
+        )
+        self.assertEqual(
+            list(
+                Recipe.objects.filter(pk__in=ids).values_list(
+                    "in_carts_count", flat=True
+                )
+            ),
+            [0, 0],
+        )
+        self.assertFalse(self.user.shopping_list_items.exists())
@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import RecipeIngredient
+
+from .factories import (
+    client_for,
+    create_ingredients,
+    create_recipes,
+    create_user,
+    image_payload,
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+RECIPE_INGREDIENT_STATEMENTS = (
+    'INSERT INTO "recipes_recipeingredient"',
+    'UPDATE "recipes_recipeingredient"',
+    'DELETE FROM "recipes_recipeingredient"',
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeIngredientsUpdateTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        cls.ingredients = create_ingredients(4)
+        cls.recipe = create_recipes([cls.author], 1, cls.ingredients[:3])[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def update(self, amounts, **fields):
+        return self.patch(
+            {
+                "name": "recipe",
+                "text": "text",
+                "cooking_time": 1,
+                "image": image_payload(),
+                "ingredients": [
+                    {"id": self.ingredients[index].pk, "amount": amount}
+                    for index, amount in amounts.items()
+                ],
+                **fields,
+            }
+        )
+
+    def patch(self, payload):
+        with CaptureQueriesContext(connection) as context:
+            response = client_for(self.author).patch(
+                f"/api/recipes/{self.recipe.pk}/", payload, format="json"
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response, [
+            query["sql"].split(" ", 1)[0]
+            for query in context.captured_queries
+            if query["sql"].startswith(RECIPE_INGREDIENT_STATEMENTS)
+        ]
+
+    def test_unchanged_ingredients_skip_the_table(self):
+        response, statements = self.update({0: 1, 1: 2, 2: 3}, name="renamed")
+        self.assertEqual(statements, [])
+        self.assertEqual(response.data["name"], "renamed")
+
+    def test_changed_ingredients_issue_one_statement_per_kind(self):
+        kept = RecipeIngredient.objects.get(
+            recipe=self.recipe, ingredient=self.ingredients[0]
+        )
+        response, statements = self.update({0: 5, 1: 2, 3: 1})
+        self.assertEqual(sorted(statements), ["DELETE", "INSERT", "UPDATE"])
+        self.assertEqual(
+            sorted(
+                (ingredient["id"], ingredient["amount"])
+                for ingredient in response.data["ingredients"]
+            ),
+            [
+                (self.ingredients[0].pk, 5),
+                (self.ingredients[1].pk, 2),
+                (self.ingredients[3].pk, 1),
+            ],
+        )
+        self.assertTrue(RecipeIngredient.objects.filter(pk=kept.pk, amount=5).exists())
+
+    def test_update_without_ingredients_skips_the_table(self):
+        response, statements = self.patch({"name": "renamed"})
+        self.assertEqual(statements, [])
+        self.assertEqual(response.data["name"], "renamed")
+        self.assertEqual(len(response.data["ingredients"]), 3)
+
+    def test_update_with_empty_ingredients_is_rejected(self):
+        response = client_for(self.author).patch(
+            f"/api/recipes/{self.recipe.pk}/", {"ingredients": []}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
@@ -1,4 +1,8 @@
-from django.db.models import F, Sum
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
@@ -11,34 +15,75 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 
+from api.cache import CachedResponseMixin, ConditionalResponseMixin
 from api.pagination import DefaultPagination
 from api.permissions import IsAuthorOrReadOnly
+from foodgram.cache import get_user_state_version
+from foodgram.concurrency import AsyncActionsMixin
+from foodgram.const import (
+    RECIPE_MATCH_DEFAULT_LIMIT,
+    RECIPE_MATCH_MAX_LIMIT,
+    SHOPPING_LIST_FILENAME,
+)
+from foodgram.links import create_link, create_links, delete_link, delete_links
+from foodgram.replicas import ReplicaReadMixin
 
+from .exports import SHOPPING_LIST_RENDERERS, shopping_list_rows
 from .filters import IngredientFilter, RecipeFilter
-from .models import Ingredient, Recipe, RecipeIngredient
+from .ingredient_index import ingredient_index
+from .links import change_recipe_links
+from .match_index import recipe_match_index
+from .models import Favorite, Ingredient, Recipe, ShoppingCart, ShoppingListItem
 from .serializers import (
     IngredientSerializer,
     RecipeCreateSerializer,
+    RecipeIdsSerializer,
+    RecipeMatchSerializer,
     RecipeMinifiedSerializer,
     RecipeSerializer,
+    ShoppingListItemSerializer,
 )
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(
+    AsyncActionsMixin,
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
     search_fields = ("^name",)
+    cache_namespace = "ingredients"
+    async_actions = ("list",)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(self.search, request, *args, **kwargs)
+
+    def search(self, request, *args, **kwargs):
+        return Response(ingredient_index.search(request.query_params.get("name")))
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    AsyncActionsMixin,
+    ReplicaReadMixin,
+    ConditionalResponseMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Recipe.objects.all()
     pagination_class = DefaultPagination
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    cache_namespace = "recipes"
+    async_actions = ("retrieve", "download_shopping_cart", "shopping_list")
+
+    def get_queryset(self):
+        return Recipe.objects.for_user(self.request.user)
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
@@ -46,6 +91,46 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return RecipeCreateSerializer
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_version(self, request):
+        if not hasattr(self, "_version"):
+            self._version = {"updated": None, "total": 0}
+            if self.action == "retrieve":
+                try:
+                    queryset = Recipe.objects.filter(pk=self.kwargs["pk"])
+                except (TypeError, ValueError):
+                    return self._version
+            else:
+                queryset = self.filter_queryset(Recipe.objects.all())
+            self._version = queryset.aggregate(
+                updated=Max("updated"), total=Count("pk")
+            )
+        return self._version
+
+    def get_etag(self, request):
+        version = self.get_version(request)
+        if version["updated"] is None:
+            return None
+        key = hashlib.md5(
+            "{}:{}:{}:{}".format(
+                request.get_full_path(),
+                version["updated"].isoformat(),
+                version["total"],
+                get_user_state_version(request.user),
+            ).encode("utf-8")
+        ).hexdigest()
+        return f'"{key}"' if self.action == "retrieve" else f'W/"{key}"'
+
+    def get_last_modified(self, request):
+        if self.action != "retrieve" or request.user.is_authenticated:
+            return None
+        return self.get_version(request)["updated"]
+
     @action(
         detail=True,
         methods=("get",),
@@ -60,6 +145,49 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return Response({"short-link": short_link}, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[AllowAny],
+        url_path="match",
+    )
+    def match(self, request):
+        try:
+            ingredient_ids = {
+                int(value)
+                for values in request.query_params.getlist("ingredients")
+                for value in values.split(",")
+                if value.strip()
+            }
+            limit = int(request.query_params.get("limit", RECIPE_MATCH_DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {"errors": "Идентификаторы ингредиентов и лимит должны быть числами"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not ingredient_ids:
+            return Response(
+                {"errors": "Укажите хотя бы один ингредиент"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        limit = min(max(limit, 1), RECIPE_MATCH_MAX_LIMIT)
+        ranked = recipe_match_index.match(ingredient_ids, limit)
+        recipes = Recipe.objects.in_bulk([recipe_id for recipe_id, *_ in ranked])
+        results = []
+        for recipe_id, matched, total in ranked:
+            recipe = recipes.get(recipe_id)
+            if recipe is None:
+                continue
+            recipe.matched_ingredients = matched
+            recipe.total_ingredients = total
+            recipe.coverage = round(matched / total, 4)
+            results.append(recipe)
+        serializer = RecipeMatchSerializer(
+            results, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
+
     @action(
         detail=False,
         methods=["get"],
@@ -70,7 +198,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
         qs = Recipe.objects.filter(shopping_cart__user=request.user)
         page = self.paginate_queryset(qs)
         serializer = RecipeMinifiedSerializer(
-            page or qs, many=True, context={"request": request}
+            page if page is not None else qs,
+            many=True,
+            context={"request": request},
         )
         if page is not None:
             return self.get_paginated_response(serializer.data)
@@ -83,21 +213,44 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_path="download_shopping_cart",
     )
     def download_shopping_cart(self, request):
-        qs = (
-            RecipeIngredient.objects.filter(recipe__shopping_cart__user=request.user)
-            .values(
-                name=F("ingredient__name"),
-                unit=F("ingredient__measurement_unit"),
+        file_type = request.query_params.get("type", "txt")
+        if file_type not in SHOPPING_LIST_RENDERERS:
+            return Response(
+                {"errors": f"Неподдерживаемый формат файла: {file_type}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            .annotate(total_amount=Sum("amount"))
-            .order_by("name")
+
+        render, content_type = SHOPPING_LIST_RENDERERS[file_type]
+        response = StreamingHttpResponse(
+            render(shopping_list_rows(request.user)), content_type=content_type
         )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{SHOPPING_LIST_FILENAME}.{file_type}"'
+        )
+        return response
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated],
+        url_path="shopping_list",
+    )
+    def shopping_list(self, request):
+        items = (
+            ShoppingListItem.objects.filter(user=request.user)
+            .select_related("ingredient")
+            .order_by("ingredient__name")
+        )
+        return Response(ShoppingListItemSerializer(items, many=True).data)
 
-        lines = [
-            f"{item['name']} ({item['unit']}) — {item['total_amount']}\n" for item in qs
-        ]
-        content = "".join(lines)
-        return Response(content, content_type="text/plain")
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[IsAuthenticated],
+        url_path="shopping_cart/bulk",
+    )
+    def shopping_cart_bulk(self, request):
+        return self.change_in_bulk(request, ShoppingCart)
 
     @action(
         detail=True,
@@ -111,26 +264,26 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return self.remove_from_shopping_cart(request, pk)
 
     @staticmethod
+    @transaction.atomic
     def add_to_shopping_cart(request, pk=None):
         recipe = get_object_or_404(Recipe, pk=pk)
-        user = request.user
-        if recipe.shopping_cart.filter(user=user).exists():
+        if not create_link(ShoppingCart, user_id=request.user.id, recipe_id=recipe.id):
             return Response(
                 {"errors": "Рецепт уже в корзине"}, status=status.HTTP_400_BAD_REQUEST
             )
-        recipe.shopping_cart.create(user=user)
+        change_recipe_links(ShoppingCart, request.user.id, [recipe.id], 1)
         data = RecipeMinifiedSerializer(recipe, context={"request": request}).data
         return Response(data, status=status.HTTP_201_CREATED)
 
     @staticmethod
+    @transaction.atomic
     def remove_from_shopping_cart(request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        user = request.user
-        if not recipe.shopping_cart.filter(user=user).exists():
+        if not delete_link(ShoppingCart, user_id=request.user.id, recipe_id=pk):
+            get_object_or_404(Recipe, pk=pk)
             return Response(
                 {"errors": "Рецепта нет в корзине"}, status=status.HTTP_400_BAD_REQUEST
             )
-        recipe.shopping_cart.filter(user=user).delete()
+        change_recipe_links(ShoppingCart, request.user.id, [pk], -1)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -143,7 +296,9 @@ class RecipeViewSet(viewsets.ModelViewSet):
         qs = Recipe.objects.filter(favorites__user=request.user)
         page = self.paginate_queryset(qs)
         serializer = RecipeMinifiedSerializer(
-            page or qs, many=True, context={"request": request}
+            page if page is not None else qs,
+            many=True,
+            context={"request": request},
         )
         return (
             self.get_paginated_response(serializer.data)
@@ -151,6 +306,15 @@ class RecipeViewSet(viewsets.ModelViewSet):
             else Response(serializer.data)
         )
 
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[IsAuthenticated],
+        url_path="favorite/bulk",
+    )
+    def favorite_bulk(self, request):
+        return self.change_in_bulk(request, Favorite)
+
     @action(
         detail=True,
         methods=["post", "delete"],
@@ -163,23 +327,65 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return self.remove_from_favorite(request, pk)
 
     @staticmethod
+    @transaction.atomic
     def add_to_favorite(request, pk=None):
         recipe = get_object_or_404(Recipe, pk=pk)
-        if recipe.favorites.filter(user=request.user).exists():
+        if not create_link(Favorite, user_id=request.user.id, recipe_id=recipe.id):
             return Response(
                 {"errors": "Рецепт уже в избранном"}, status=status.HTTP_400_BAD_REQUEST
             )
-        recipe.favorites.create(user=request.user)
+        change_recipe_links(Favorite, request.user.id, [recipe.id], 1)
         data = RecipeMinifiedSerializer(recipe, context={"request": request}).data
         return Response(data, status=status.HTTP_201_CREATED)
 
     @staticmethod
+    @transaction.atomic
     def remove_from_favorite(request, pk=None):
-        recipe = get_object_or_404(Recipe, pk=pk)
-        if not recipe.favorites.filter(user=request.user).exists():
+        if not delete_link(Favorite, user_id=request.user.id, recipe_id=pk):
+            get_object_or_404(Recipe, pk=pk)
             return Response(
                 {"errors": "Рецепта нет в избранном"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        recipe.favorites.filter(user=request.user).delete()
+        change_recipe_links(Favorite, request.user.id, [pk], -1)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def change_in_bulk(request, model):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = list(dict.fromkeys(serializer.validated_data["recipes"]))
+
+        with transaction.atomic():
+            found = set(
+                Recipe.objects.filter(pk__in=recipe_ids).values_list("pk", flat=True)
+            )
+            if request.method == "POST":
+                changed = create_links(
+                    model, "recipe_id", found, user_id=request.user.id
+                )
+                delta, outcomes = 1, ("added", "exists")
+            else:
+                changed = delete_links(
+                    model, "recipe_id", found, user_id=request.user.id
+                )
+                delta, outcomes = -1, ("removed", "absent")
+            if changed:
+                change_recipe_links(model, request.user.id, changed, delta)
+
+        return Response(
+            {
+                "results": [
+                    {
+                        "id": recipe_id,
+                        "status": (
+                            "not_found"
+                            if recipe_id not in found
+                            else outcomes[recipe_id not in changed]
+                        ),
+                    }
+                    for recipe_id in recipe_ids
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )
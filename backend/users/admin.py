@@ -6,7 +6,16 @@ from users.models import User
 
 @register(User)
 class UserAdminConfig(UserAdmin):
-    list_display = ("pk", "username", "email", "first_name", "last_name", "is_staff")
+    list_display = (
+        "pk",
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "recipes_count",
+        "subscribers_count",
+        "is_staff",
+    )
     search_fields = ("username", "email")
     list_filter = ("is_staff", "is_superuser", "is_active")
     ordering = ("username",)
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.3 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_alter_user_managers"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="recipes_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество рецептов"
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="subscribers_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество подписчиков"
+            ),
+        ),
+    ]
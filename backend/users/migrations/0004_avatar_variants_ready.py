@@ -0,0 +1,35 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:08
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+from foodgram.images import variant_names
+
+
+def fill_avatar_variants_ready(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    ready = [
+        name
+        for name in User.objects.values_list("avatar", flat=True).distinct()
+        if name
+        and all(default_storage.exists(path) for path in variant_names(name).values())
+    ]
+    User.objects.filter(avatar__in=ready).update(avatar_variants_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_user_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_variants_ready",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="Варианты аватара готовы"
+            ),
+        ),
+        migrations.RunPython(fill_avatar_variants_ready, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import RegexValidator
 from django.db import models
 
@@ -10,9 +10,29 @@ from foodgram.const import (
     USER_USERNAME_MAX_LENGTH,
     USER_USERNAME_REGEX,
 )
+from foodgram.models import CounterFieldsMixin
 
 
-class User(AbstractUser):
+class UserQuerySet(models.QuerySet):
+    def with_subscription_flag(self, user):
+        if not user.is_authenticated:
+            return self.annotate(
+                is_subscribed=models.Value(False, output_field=models.BooleanField())
+            )
+        return self.annotate(
+            is_subscribed=models.Exists(
+                User.subscriptions.through.objects.filter(
+                    from_user_id=user.pk, to_user_id=models.OuterRef("pk")
+                )
+            )
+        )
+
+
+class FoodgramUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
+
+
+class User(CounterFieldsMixin, AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "first_name", "last_name"]
 
@@ -49,6 +69,19 @@ class User(AbstractUser):
         blank=True,
         verbose_name="Подписки",
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Количество рецептов"
+    )
+    subscribers_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Количество подписчиков"
+    )
+    avatar_variants_ready = models.BooleanField(
+        default=False, editable=False, verbose_name="Варианты аватара готовы"
+    )
+
+    objects = FoodgramUserManager()
+
+    counter_fields = ("recipes_count", "subscribers_count", "avatar_variants_ready")
 
     class Meta:
         verbose_name = "Пользователь"
@@ -1,13 +1,15 @@
 from django.contrib.auth.password_validation import validate_password
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
+from api.fields import Base64ImageField, ImageVariantsField
+
 from .models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
     avatar = Base64ImageField(use_url=True)
+    avatar_variants = ImageVariantsField(source="avatar", ready="avatar_variants_ready")
 
     class Meta:
         model = User
@@ -19,12 +21,15 @@ class UserSerializer(serializers.ModelSerializer):
             "last_name",
             "is_subscribed",
             "avatar",
+            "avatar_variants",
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            return request.user in obj.subscribers.all()
+            return obj.subscribers.filter(pk=request.user.pk).exists()
         return False
 
 
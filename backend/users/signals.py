@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import token_cache
+from foodgram.images import image_processed, schedule_image_processing
+
+from .models import User
+from .subscriptions import change_subscriptions
+
+Subscription = User.subscriptions.through
+
+
+def change_subscribers_count(links, sign):
+    authors = defaultdict(list)
+    for user_id, author_id in links.values_list("from_user", "to_user"):
+        authors[user_id].append(author_id)
+    for user_id, author_ids in authors.items():
+        change_subscriptions(user_id, author_ids, sign)
+
+
+@receiver(m2m_changed, sender=Subscription)
+def subscriptions_changed(instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "pre_remove", "pre_clear"):
+        return
+    links = Subscription.objects.filter(
+        **{"to_user" if reverse else "from_user": instance}
+    )
+    if pk_set is not None:
+        links = links.filter(**{"from_user__in" if reverse else "to_user__in": pk_set})
+    change_subscribers_count(links, 1 if action == "post_add" else -1)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleted(instance, **kwargs):
+    change_subscribers_count(Subscription.objects.filter(from_user=instance), -1)
+
+
+@receiver(post_save, sender=User)
+def avatar_saved(instance, created, update_fields, **kwargs):
+    if update_fields is None or "avatar" in update_fields:
+        if not created:
+            User.objects.filter(pk=instance.pk).update(avatar_variants_ready=False)
+        schedule_image_processing(instance.avatar)
+
+
+@receiver(image_processed)
+def avatar_processed(name, **kwargs):
+    User.objects.filter(avatar=name).update(avatar_variants_ready=True)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(instance, **kwargs):
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_tokens_changed(instance, **kwargs):
+    token_cache.delete(
+        *Token.objects.filter(user=instance).values_list("key", flat=True)
+    )
@@ -0,0 +1,12 @@
+from django.db.models import F
+
+from foodgram.cache import invalidate_user_state
+
+from .models import User
+
+
+def change_subscriptions(user_id, author_ids, delta):
+    User.objects.filter(pk__in=author_ids).update(
+        subscribers_count=F("subscribers_count") + delta
+    )
+    invalidate_user_state(user_id)